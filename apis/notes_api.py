@@ -1,15 +1,40 @@
+from typing import Any, Optional
+
 import requests
+from requests import Response
+
+from utils.schema_validator import validate_response
+
 
 class NotesApi:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, token: Optional[str] = None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["x-auth-token"] = token
+
+    def health_check(self) -> Response:
+        response = requests.get(f"{self.base_url}/health-check", headers=self.headers)
+        return response
 
-    def create_note(self, title: str, description: str, category: str):
+    def create_note(self, title: str, description: str, category: str) -> Response:
         payload = {
             "title": title,
             "description": description,
             "category": category
         }
         response = requests.post(f"{self.base_url}/notes", json=payload, headers=self.headers)
-        return response
\ No newline at end of file
+        return response
+
+    def get_notes(self) -> Response:
+        response = requests.get(f"{self.base_url}/notes", headers=self.headers)
+        return response
+
+    def get_note(self, note_id: str) -> Response:
+        response = requests.get(f"{self.base_url}/notes/{note_id}", headers=self.headers)
+        return response
+
+    @staticmethod
+    def validate(response: Response, schema_name: str, expected_status: Optional[int] = None) -> Any:
+        """Check a response's status and body against an endpoint contract; returns the parsed JSON"""
+        return validate_response(response, schema_name, expected_status)
@@ -0,0 +1,65 @@
+# apis/schemas.py
+"""Response contracts (JSON Schema, draft-07) for the Notes API endpoints"""
+from typing import Any, Dict, Optional
+
+Schema = Dict[str, Any]
+
+
+def _envelope(data: Optional[Schema] = None) -> Schema:
+    """Every Notes API response shares the success/status/message envelope"""
+    schema: Schema = {
+        "type": "object",
+        "required": ["success", "status", "message"],
+        "properties": {
+            "success": {"type": "boolean"},
+            "status": {"type": "integer"},
+            "message": {"type": "string"},
+        },
+    }
+    if data is not None:
+        schema["required"].append("data")
+        schema["properties"]["data"] = data
+    return schema
+
+
+USER: Schema = {
+    "type": "object",
+    "required": ["id", "name", "email"],
+    "properties": {
+        "id": {"type": "string", "minLength": 1},
+        "name": {"type": "string"},
+        "email": {"type": "string"},
+    },
+}
+
+LOGGED_IN_USER: Schema = {
+    **USER,
+    "required": USER["required"] + ["token"],
+    "properties": {**USER["properties"], "token": {"type": "string", "minLength": 1}},
+}
+
+NOTE: Schema = {
+    "type": "object",
+    "required": ["id", "title", "description", "category", "completed", "created_at", "updated_at", "user_id"],
+    "properties": {
+        "id": {"type": "string", "minLength": 1},
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "category": {"enum": ["Home", "Work", "Personal"]},
+        "completed": {"type": "boolean"},
+        "created_at": {"type": "string"},
+        "updated_at": {"type": "string"},
+        "user_id": {"type": "string"},
+    },
+}
+
+# Schema name -> contract for a successful response
+SCHEMAS: Dict[str, Schema] = {
+    "error": _envelope(),
+    "health_check": _envelope(),
+    "register_user": _envelope(USER),
+    "login_user": _envelope(LOGGED_IN_USER),
+    "create_note": _envelope(NOTE),
+    "get_note": _envelope(NOTE),
+    "get_notes": _envelope({"type": "array", "items": NOTE}),
+}
@@ -0,0 +1,59 @@
+from typing import List, Optional, Sequence
+
+from playwright.sync_api import Locator, Page
+
+from utils.config import config
+
+
+class BasePage:
+    """Common behaviour shared by all page objects"""
+
+    def __init__(self, page: Page):
+        self.page = page
+
+    def expect_matches_baseline(self, name: str,
+                                mask: Optional[List[Locator]] = None,
+                                ignore_regions: Sequence = (),
+                                full_page: bool = False):
+        """
+        Compare a screenshot of the current page with the stored baseline
+
+        Baselines are stored per environment and browser and are committed with the
+        tests. A missing baseline fails the check; --update-baselines records the
+        current screenshot instead of comparing. Only the diff image is attached to
+        Allure, and only when the check fails.
+
+        Args:
+            name: Baseline name, e.g. "checkout"
+            mask: Locators painted over by Playwright (dynamic content)
+            ignore_regions: (x, y, width, height) boxes excluded from the pixel diff
+            full_page: Capture the full scrollable page
+        """
+        # Imported here so NumPy/Pillow only load for tests that do visual checks
+        from utils.visual_compare import VisualComparator
+
+        comparator = VisualComparator()
+        screenshot = self.page.screenshot(full_page=full_page, mask=mask or [],
+                                          animations="disabled", caret="hide")
+        baseline_path = comparator.baseline_path(name)
+
+        if config.update_baselines:
+            comparator.save_baseline(name, screenshot)
+            print(f"📸 Baseline saved: {baseline_path}")
+            return
+        if not baseline_path.exists():
+            raise AssertionError(f"No baseline for screenshot '{name}' at {baseline_path}; "
+                                 f"record it with --update-baselines and commit it")
+
+        result = comparator.compare_to_baseline(name, screenshot, ignore_regions)
+        print(f"🖼️ Visual check '{name}': {result.reason} ({result.elapsed_ms:.1f}ms)")
+
+        if not result.matched:
+            import allure
+
+            allure.attach(
+                result.diff_image,
+                name=f"Visual Diff - {name} - {config.current_env.upper()}/{config.current_browser}",
+                attachment_type=allure.attachment_type.PNG
+            )
+            raise AssertionError(f"Screenshot '{name}' does not match baseline {baseline_path}: {result.reason}")
@@ -1,10 +1,11 @@
 from playwright.sync_api import Page
+from pages.base_page import BasePage
 from utils.config import config
 
 
-class CartPage:
+class CartPage(BasePage):
     def __init__(self, page: Page):
-        self.page = page
+        super().__init__(page)
         self.url = config.ui_base_url
         self.add_to_cart_btn = page.locator("text=ADD TO CART").first
         self.cart_icon = page.locator(".cart-icon")
@@ -4,6 +4,7 @@ import pytest
 import requests
 from typing import Dict, Any
 from utils.config import config
+from utils.schema_validator import validate_response
 
 from requests import Response
 
@@ -30,7 +31,7 @@ def test_notes_api_health_check() -> None:
 
     assert response.status_code == 200
 
-    json_data: Dict[str, Any] = response.json()
+    json_data: Dict[str, Any] = validate_response(response, "health_check")
     print("Response: ", json_data)
 
     assert json_data["success"] is True
@@ -58,7 +59,7 @@ def test_new_user_registration() -> None:
 
     response: Response = requests.post(url, json=data, headers=headers)
 
-    response_data: Dict[str, Any] = response.json()
+    response_data: Dict[str, Any] = validate_response(response, "register_user")
     print("New user Registration Response: ", response_data)
 
     #     Assertions
@@ -91,7 +92,7 @@ def test_user_login() -> None:
 
     response: Response = requests.post(url, json=data, headers=headers)
 
-    response_data: Dict[str, Any] = response.json()
+    response_data: Dict[str, Any] = validate_response(response, "login_user")
     print("User Login Response: ", response_data)
 
     #     Assertions
@@ -3,6 +3,7 @@ import requests
 from typing import Dict, Any
 from requests import Response
 from apis.authtoken_generator import get_auth_token
+from utils.schema_validator import validate_response
 
 # Base URL used across all API requests
 BASE_URL: str = "https://practice.expandtesting.com/notes/api"
@@ -36,7 +37,7 @@ def test_create_notes(get_token: str) -> None:
 
     response: Response = requests.post(url, json=data, headers=headers)
 
-    response_data: Dict[str, Any] = response.json()
+    response_data: Dict[str, Any] = validate_response(response, "create_note")
     print("Noted Created Response: ", response_data)
 
     #     Assertions
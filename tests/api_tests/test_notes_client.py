@@ -0,0 +1,38 @@
+import random
+from typing import Any, Dict
+
+import pytest
+
+from apis.notes_api import NotesApi
+
+# Well-formed note id that does not exist
+MISSING_NOTE_ID: str = "000000000000000000000000"
+
+
+@pytest.mark.api_tests
+@pytest.mark.all_tests
+def test_created_note_is_listed_and_fetched(api_client: NotesApi) -> None:
+    title: str = f"ATP note {random.randint(1000, 9999)}"
+
+    created: Dict[str, Any] = api_client.validate(
+        api_client.create_note(title, "Created through the NotesApi client", "Work"), "create_note")
+    note_id: str = created["data"]["id"]
+    print("Note Created Response: ", created)
+
+    notes: Dict[str, Any] = api_client.validate(api_client.get_notes(), "get_notes")
+    assert note_id in [note["id"] for note in notes["data"]]
+
+    note: Dict[str, Any] = api_client.validate(api_client.get_note(note_id), "get_note")
+    assert note["data"]["title"] == title
+    assert note["data"]["category"] == "Work"
+
+
+@pytest.mark.api_tests
+@pytest.mark.all_tests
+def test_missing_note_returns_error_envelope(api_client: NotesApi) -> None:
+    response_data: Dict[str, Any] = api_client.validate(api_client.get_note(MISSING_NOTE_ID), "get_note",
+                                                        expected_status=404)
+    print("Missing Note Response: ", response_data)
+
+    assert response_data["success"] is False
+    assert response_data["status"] == 404
@@ -1,18 +1,28 @@
 import os
-import subprocess
-import sys
 import platform
+import time
 from datetime import datetime
+from typing import Any, Dict
 
-import allure
 import pytest
-from playwright.sync_api import sync_playwright
 
 from apis.authtoken_generator import get_auth_token
 from apis.notes_api import NotesApi
+from utils.browser_logs import SESSION_STATS, BrowserLogCapture, add_to_session, session_overhead_summary
 from utils.config import config
-from utils.page_manager import PageManager
+from utils.run_history import DEFAULT_DB_PATH, RunHistory
+from utils.smart_retry import RetryNextItem, SmartRetry
 from utils.soft_assert import SoftAssert
+from utils.wait_audit import wait_auditor
+
+# Playwright, allure and the page objects are imported inside the fixtures and
+# hooks that need them, so API-only runs never pay for the browser machinery.
+# Measure startup with: python -m utils.startup_profiler --test-type api
+
+run_history = None
+smart_retry = None
+# Per-test outcome/duration accumulated over setup, call and teardown
+_history_pending: Dict[str, Dict[str, Any]] = {}
 
 
 def pytest_addoption(parser):
@@ -40,6 +50,90 @@ def pytest_addoption(parser):
         help="Type of tests to run: ui, api, both"
     )
 
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        default=False,
+        help="Overwrite visual baselines with the current screenshots"
+    )
+
+    parser.addoption(
+        "--wait-audit",
+        action="store_true",
+        default=False,
+        help="Record Playwright waits/navigations/actions and report wasted waiting"
+    )
+
+    parser.addoption(
+        "--run-history-db",
+        action="store",
+        default=str(DEFAULT_DB_PATH),
+        help="SQLite database that test results are appended to"
+    )
+
+    parser.addoption(
+        "--no-run-history",
+        action="store_true",
+        default=False,
+        help="Do not record results in the run history database"
+    )
+
+    parser.addoption(
+        "--flaky-retries",
+        action="store",
+        type=int,
+        default=1,
+        help="Retries for flaky tests (history-identified, or @pytest.mark.flaky without a count)"
+    )
+
+    parser.addoption(
+        "--retry-budget",
+        action="store",
+        type=int,
+        default=5,
+        help="Maximum number of in-place retries per session (per xdist worker)"
+    )
+
+    parser.addoption(
+        "--retry-backoff",
+        action="store",
+        type=float,
+        default=1.0,
+        help="Seconds to wait before the first retry; doubled for every further retry"
+    )
+
+    parser.addoption(
+        "--retry-flaky-from-history",
+        action="store",
+        type=float,
+        default=None,
+        metavar="FLAKE_RATE",
+        help="Also retry tests whose flake rate in the run history is at least FLAKE_RATE (e.g. 0.1)"
+    )
+
+    parser.addoption(
+        "--browser-log-buffer",
+        action="store",
+        type=int,
+        default=200,
+        help="Max console/page-error/network records kept per test (oldest dropped first)"
+    )
+
+    parser.addoption(
+        "--capture-http-errors",
+        action="store_true",
+        default=False,
+        help="Also capture 4xx/5xx responses (adds a listener that sees every response)"
+    )
+
+    parser.addoption(
+        "--max-js-errors",
+        action="store",
+        type=int,
+        default=None,
+        help="Fail UI tests that log more than this many JS errors (page errors + console errors)"
+    )
+
 
 @pytest.fixture(scope="session", autouse=True)
 def configure_test_environment(request):
@@ -50,6 +144,8 @@ def configure_test_environment(request):
     # Set the global configuration
     config.set_environment(env)
     config.set_test_type(test_type)
+    config.set_browser(request.config.getoption("--browser-name"))
+    config.set_update_baselines(request.config.getoption("--update-baselines"))
 
     print(f"\n🔧 Test Configuration:")
     print(f"   Environment: {config.current_env.upper()}")
@@ -59,32 +155,47 @@ def configure_test_environment(request):
     print(f"   Timeout: {config.timeout}ms")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def playwright():
+    """Start Playwright lazily - only once a UI fixture is requested"""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as pw:
+        yield pw
+
+
+@pytest.fixture(scope="session")
 def browser(playwright, request):
-    """Custom browser fixture that supports Chrome"""
+    """Custom browser fixture that supports Chrome - launched once per worker, each test gets a fresh context"""
     browser_name = request.config.getoption("--browser-name")
-    headless = not request.config.getoption("--headed", default=True)
+    # --headed comes from pytest-playwright; stay headless when the plugin is disabled (-p no:playwright)
+    headless = not request.config.getoption("--headed", default=False)
 
     # Browser launch configuration with environment-specific settings
     browser_args = {
         'headless': headless,
         'slow_mo': 100 if config.current_env == 'prod' else 0,  # Slower in prod
     }
+    wait_auditor.slow_mo_ms = browser_args['slow_mo']
 
     if browser_name.lower() == "chrome":
-        return playwright.chromium.launch(channel="chrome", **browser_args)
+        browser = playwright.chromium.launch(channel="chrome", **browser_args)
     elif browser_name.lower() == "chromium":
-        return playwright.chromium.launch(**browser_args)
+        browser = playwright.chromium.launch(**browser_args)
     elif browser_name.lower() == "firefox":
-        return playwright.firefox.launch(**browser_args)
+        browser = playwright.firefox.launch(**browser_args)
     elif browser_name.lower() == "webkit":
-        return playwright.webkit.launch(**browser_args)
+        browser = playwright.webkit.launch(**browser_args)
     else:
-        return playwright.chromium.launch(**browser_args)
+        browser = playwright.chromium.launch(**browser_args)
+
+    yield browser
+
+    browser.close()
 
 
 @pytest.fixture(scope="function")
-def page(browser):
+def page(browser, request):
     """Create a new page with environment-specific configurations"""
     context = browser.new_context(
         viewport={'width': 1920, 'height': 1080},
@@ -93,19 +204,40 @@ def page(browser):
 
     page = context.new_page()
 
+    # Console/page-error/network capture, serialized to Allure only on failure
+    request.node.browser_logs = BrowserLogCapture(page, request.config.getoption("--browser-log-buffer"),
+                                                  request.config.getoption("--capture-http-errors"))
+
     # Set environment-specific timeout
     page.set_default_timeout(config.timeout)
     page.set_default_navigation_timeout(config.timeout)
 
     yield page
 
+    browser_logs = request.node.browser_logs
+    browser_logs.detach()
+    del request.node.browser_logs
+    # Moved onto this attempt's teardown report by pytest_runtest_makereport
+    request.node.browser_log_overhead = browser_logs.overhead()
     context.close()
 
 
+@pytest.fixture(autouse=True)
+def wait_audit(request):
+    """Scope wait-audit records to the running test (no-op unless --wait-audit)"""
+    if not wait_auditor.enabled:
+        yield
+        return
+
+    wait_auditor.start_test(request.node.nodeid)
+    yield
+    wait_auditor.finish_test()
+
+
 @pytest.fixture(scope="function")
-def api_client():
-    """API client configured for current environment"""
-    return NotesApi(config.api_base_url)
+def api_client(get_token):
+    """API client configured for current environment, authenticated with the session token"""
+    return NotesApi(config.api_base_url, get_token)
 
 
 @pytest.fixture(scope="session", name="get_token")
@@ -117,6 +249,8 @@ def auth_token_fixture() -> str:
 @pytest.fixture(scope="function")
 def pages(page):
     """Fixture that provides access to all page objects through PageManager"""
+    from utils.page_manager import PageManager
+
     return PageManager(page)
 
 
@@ -147,11 +281,66 @@ def pytest_collection_modifyitems(config, items):
     # For "both", no filtering is applied
 
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Retry flaky tests in place, keeping session fixtures (browser, auth token) warm"""
+    if smart_retry is None or not smart_retry.retries_for(item):
+        return None
+
+    from _pytest.runner import runtestprotocol
+
+    while True:
+        # logstart/logfinish per attempt so Allure records every attempt as its own result
+        item.retry_pending = False
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        reports = runtestprotocol(item, nextitem=RetryNextItem(item, nextitem), log=False)
+        for report in reports:
+            item.ihook.pytest_runtest_logreport(report=report)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        if not item.retry_pending:
+            return True
+        delay = smart_retry.consume(item)
+        print(f"\n🔁 Retrying {item.nodeid} (attempt {item.retry_attempt + 1}) in {delay:.1f}s")
+        time.sleep(delay)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Fail passing UI tests that logged more JS errors than --max-js-errors"""
+    outcome = yield
+    max_js_errors = item.config.getoption("--max-js-errors")
+    browser_logs = getattr(item, "browser_logs", None)
+    if outcome.excinfo is None and max_js_errors is not None and browser_logs is not None \
+            and browser_logs.js_error_count > max_js_errors:
+        outcome.force_exception(AssertionError(f"{browser_logs.js_error_count} JS errors logged "
+                                               f"(allowed {max_js_errors}): {browser_logs.counts}"))
+
+
+def pytest_report_teststatus(report):
+    """Show retried attempts as RERUN instead of counting them as failures"""
+    if report.outcome == "rerun":
+        return "rerun", "R", ("RERUN", {"yellow": True})
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item):
-    """Attach screenshot on test failure for UI tests"""
+    """Mark retryable failures as reruns; attach screenshot and browser logs on the final failure for UI tests"""
     outcome = yield
     report = outcome.get_result()
+    report.rerun = getattr(item, "retry_attempt", 0)
+
+    # A custom report attribute (unlike user_properties, not part of junitxml) that xdist
+    # serializes to the controller, which totals the capture overhead for the session
+    if report.when == "teardown" and hasattr(item, "browser_log_overhead"):
+        report.browser_log_overhead = item.browser_log_overhead
+        del item.browser_log_overhead
+
+    # Runs after allure's own makereport wrapper, so the failed attempt is still recorded there
+    if report.when in ("setup", "call") and report.failed and smart_retry is not None \
+            and smart_retry.should_retry(item, report.when):
+        report.outcome = "rerun"
+        item.retry_pending = True
+        return
 
     if report.when == "call" and report.failed:
         # Check if this is a UI test and has page fixture
@@ -159,6 +348,8 @@ def pytest_runtest_makereport(item):
             page = item.funcargs.get("page")
             if page:
                 try:
+                    import allure
+
                     screenshot = page.screenshot()
                     allure.attach(
                         screenshot,
@@ -168,12 +359,87 @@ def pytest_runtest_makereport(item):
                 except Exception as e:
                     print(f"Could not take screenshot: {e}")
 
+        browser_logs = getattr(item, "browser_logs", None)
+        if browser_logs is not None:
+            import allure
+
+            allure.attach(
+                browser_logs.serialize(),
+                name=f"Browser Logs - {config.current_env.upper()}",
+                attachment_type=allure.attachment_type.JSON
+            )
+
+
+def pytest_runtest_logreport(report):
+    """Total browser log capture overhead; append each finished test to the run history (skipped with --no-run-history)"""
+    overhead = getattr(report, "browser_log_overhead", None)
+    if overhead is not None:
+        add_to_session(*overhead)
+
+    if run_history is None:
+        return
+
+    pending = _history_pending.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0})
+    pending["duration"] += report.duration
+    if report.outcome == "rerun":
+        pending["outcome"] = "rerun"
+    elif report.failed:
+        pending["outcome"] = "failed" if report.when == "call" else "error"
+    elif report.skipped and pending["outcome"] == "passed":
+        pending["outcome"] = "skipped"
+
+    if report.when == "teardown":
+        del _history_pending[report.nodeid]
+        run_history.record(
+            run_id=os.environ["RUN_HISTORY_ID"],
+            nodeid=report.nodeid,
+            outcome=pending["outcome"],
+            duration=pending["duration"],
+            env=config.current_env,
+            browser=config.current_browser,
+            worker=os.environ.get("PYTEST_XDIST_WORKER", "main"),
+            retry_count=getattr(report, "rerun", 0),
+        )
+
 
 def pytest_configure(config):
     """Configure pytest with custom markers"""
     config.addinivalue_line("markers", "smoke: Smoke test cases")
     config.addinivalue_line("markers", "regression: Regression test cases")
     config.addinivalue_line("markers", "critical: Critical functionality tests")
+    config.addinivalue_line("markers", "flaky(retries=1): Retry the test in place when it fails")
+
+    global run_history, smart_retry
+    # Under xdist the controller also receives every worker report - only workers record
+    is_xdist_controller = not hasattr(config, "workerinput") and getattr(config.option, "dist", "no") != "no"
+    if not config.getoption("--no-run-history"):
+        # Workers inherit the controller's run id through the environment
+        os.environ.setdefault("RUN_HISTORY_ID", datetime.now().strftime("%Y%m%d_%H%M%S_%f"))
+        if not is_xdist_controller:
+            run_history = RunHistory(config.getoption("--run-history-db"))
+
+    flaky_nodeids = []
+    flake_rate = config.getoption("--retry-flaky-from-history")
+    if flake_rate is not None and os.path.exists(config.getoption("--run-history-db")):
+        history = RunHistory(config.getoption("--run-history-db"))
+        # Rows are stored with the browser name as normalised by utils.config (lowercase)
+        flaky_nodeids = [rate["nodeid"] for rate in history.flake_rates(env=config.getoption("--env"),
+                                                                        browser=config.getoption("--browser-name").lower())
+                         if rate["flake_rate"] >= flake_rate]
+        history.close()
+
+    smart_retry = SmartRetry(
+        default_retries=config.getoption("--flaky-retries"),
+        budget=config.getoption("--retry-budget"),
+        backoff=config.getoption("--retry-backoff"),
+        flaky_nodeids=flaky_nodeids,
+    )
+
+    if config.getoption("--wait-audit"):
+        # Only the controller (or a non-xdist run) clears results from previous runs
+        if not hasattr(config, "workerinput"):
+            wait_auditor.clear_results()
+        wait_auditor.install()
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -181,7 +447,7 @@ def allure_environment_setup():
     """Set up environment information for Allure report"""
     # Create environment.properties file for Allure
     env_props = f"""
-Browser=Chromium
+Browser={config.current_browser}
 Platform={platform.system()} {platform.release()}
 Python.Version={platform.python_version()}
 Execution.Start={datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -214,3 +480,15 @@ def pytest_sessionfinish(session, exitstatus):
     print(f"Environment: {config.current_env.upper()}")
     print(f"Test Type: {config.current_test_type.upper()}")
     print(f"{'=' * 60}")
+
+    # Under xdist only the controller has the totals from every worker
+    if SESSION_STATS["tests"] and not hasattr(session.config, "workerinput"):
+        print(session_overhead_summary())
+
+    if run_history is not None:
+        run_history.close()
+
+    if wait_auditor.enabled:
+        wait_auditor.dump(os.environ.get("PYTEST_XDIST_WORKER", "main"))
+        if not hasattr(session.config, "workerinput"):
+            wait_auditor.print_report()
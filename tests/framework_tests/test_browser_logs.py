@@ -0,0 +1,188 @@
+"""BrowserLogCapture on a fake page, and the page fixture's overhead reporting through pytester"""
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from utils.browser_logs import BrowserLogCapture
+
+pytest_plugins = ["pytester"]
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+class FakePage:
+    """Just enough of playwright's Page event API"""
+
+    def __init__(self) -> None:
+        self.handlers: Dict[str, List[Callable[[Any], None]]] = {}
+
+    def on(self, event: str, handler: Callable[[Any], None]) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event: str, handler: Callable[[Any], None]) -> None:
+        self.handlers[event].remove(handler)
+
+    def emit(self, event: str, payload: Any) -> None:
+        for handler in self.handlers.get(event, []):
+            handler(payload)
+
+
+def console(message_type: str, text: str) -> SimpleNamespace:
+    return SimpleNamespace(type=message_type, text=text)
+
+
+def failed_request(url: str) -> SimpleNamespace:
+    return SimpleNamespace(method="GET", url=url, failure="net::ERR_CONNECTION_REFUSED")
+
+
+def http_response(status: int, url: str) -> SimpleNamespace:
+    return SimpleNamespace(status=status, url=url, request=SimpleNamespace(method="POST"))
+
+
+@pytest.mark.all_tests
+def test_ring_buffers_keep_the_newest_records_but_count_everything() -> None:
+    page = FakePage()
+    capture = BrowserLogCapture(page, capacity=3)
+
+    for index in range(5):
+        page.emit("console", console("error" if index % 2 else "log", f"message {index}"))
+        page.emit("pageerror", SimpleNamespace(name="TypeError", message=f"error {index}"))
+        page.emit("requestfailed", failed_request(f"https://example.test/{index}"))
+
+    assert [text for _, _, text in capture.console] == ["message 2", "message 3", "message 4"]
+    assert [message for _, _, message in capture.page_errors] == ["error 2", "error 3", "error 4"]
+    assert [url for _, _, url, _ in capture.network] == [f"https://example.test/{i}" for i in (2, 3, 4)]
+    assert capture.counts == {"console": 5, "console_errors": 2, "page_errors": 5, "failed_requests": 5}
+    assert capture.js_error_count == 7
+    assert capture.overhead() == (15, capture.handler_ns)
+
+
+@pytest.mark.all_tests
+def test_serialize_is_json_with_offsets_counts_and_overhead() -> None:
+    page = FakePage()
+    capture = BrowserLogCapture(page, capacity=2)
+    page.emit("console", console("warning", "slow script"))
+    page.emit("pageerror", SimpleNamespace(name="ReferenceError", message="x is not defined"))
+    page.emit("requestfailed", failed_request("https://example.test/api"))
+
+    snapshot = json.loads(capture.serialize())
+
+    assert snapshot["counts"] == capture.counts
+    assert snapshot["capture_overhead_ms"] >= 0
+    assert [(entry["type"], entry["text"]) for entry in snapshot["console"]] == [("warning", "slow script")]
+    assert snapshot["page_errors"][0]["name"] == "ReferenceError"
+    assert snapshot["network"][0] == {"t_ms": snapshot["network"][0]["t_ms"], "method": "GET",
+                                      "url": "https://example.test/api", "failure": "net::ERR_CONNECTION_REFUSED"}
+    assert all(entry["t_ms"] >= 0 for key in ("console", "page_errors", "network") for entry in snapshot[key])
+
+
+@pytest.mark.all_tests
+def test_http_errors_are_opt_in_and_detach_removes_every_listener() -> None:
+    page = FakePage()
+    default = BrowserLogCapture(page)
+    assert "response" not in page.handlers
+
+    with_http = BrowserLogCapture(page, http_errors=True)
+    page.emit("response", http_response(200, "https://example.test/ok"))
+    page.emit("response", http_response(503, "https://example.test/down"))
+    assert [(method, url, status) for _, method, url, status in with_http.network] == \
+        [("POST", "https://example.test/down", 503)]
+
+    default.detach()
+    with_http.detach()
+    assert all(not handlers for handlers in page.handlers.values())
+
+
+FAKE_BROWSER_CONFTEST = """
+import json
+
+import pytest
+
+from tests import conftest as repo_conftest
+from tests.conftest import *  # noqa: F401,F403 - the repo's hooks and fixtures
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.handlers[event].remove(handler)
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def set_default_navigation_timeout(self, timeout):
+        pass
+
+
+class FakeContext:
+    def new_page(self):
+        return FakePage()
+
+    def close(self):
+        pass
+
+
+class FakeBrowser:
+    def new_context(self, **kwargs):
+        return FakeContext()
+
+
+@pytest.fixture(scope="session")
+def browser():
+    return FakeBrowser()
+
+
+report_config = []
+
+
+def pytest_configure(config):
+    report_config.append(config)
+    repo_conftest.pytest_configure(config)
+
+
+def pytest_runtest_logreport(report):
+    # Round-trip like pytest-xdist does between worker and controller, then hand the
+    # restored report to the repo's hook as the controller would
+    if report.when == "teardown":
+        config = report_config[0]
+        data = config.hook.pytest_report_to_serializable(config=config, report=report)
+        report = config.hook.pytest_report_from_serializable(config=config, data=json.loads(json.dumps(data)))
+        with open("overhead.txt", "a") as f:
+            f.write(json.dumps(getattr(report, "browser_log_overhead", None)) + "\\n")
+    repo_conftest.pytest_runtest_logreport(report)
+"""
+
+
+@pytest.mark.all_tests
+def test_page_fixture_reports_overhead_on_the_report_not_in_junitxml(pytester: pytest.Pytester,
+                                                                    monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    pytester.makeconftest(FAKE_BROWSER_CONFTEST)
+    pytester.makepyfile("""
+        from types import SimpleNamespace
+
+        def test_logs_console(page):
+            for handler in page.handlers["console"]:
+                handler(SimpleNamespace(type="log", text="hello"))
+
+        def test_without_page():
+            pass
+    """)
+
+    result = pytester.runpytest_subprocess("-p", "no:cacheprovider", "--no-run-history", "-s",
+                                           "--junitxml", "junit.xml")
+
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["Browser log capture: 1 events over 1 tests*"])
+    overheads = [json.loads(line) for line in (pytester.path / "overhead.txt").read_text().splitlines()]
+    assert [overhead[0] if overhead else None for overhead in overheads] == [1, None]
+    assert "browser_log" not in (pytester.path / "junit.xml").read_text()
@@ -0,0 +1,88 @@
+"""RunHistory queries on a temporary SQLite database"""
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+import pytest
+
+from utils.run_history import RunHistory
+
+NODEID = "tests/api_tests/test_notes.py::test_notes_api_health_check"
+
+
+@pytest.fixture
+def history(tmp_path: Path) -> Iterator[RunHistory]:
+    history = RunHistory(tmp_path / "history.db", batch_size=1000)
+    yield history
+    history.close()
+
+
+def record_runs(history: RunHistory, outcomes: List[str], nodeid: str = NODEID,
+                durations: Sequence[float] = (), env: str = "qa") -> None:
+    """One run per outcome, oldest first; 'flaky' records a rerun attempt and a pass after retry"""
+    for index, outcome in enumerate(outcomes):
+        run_id = f"run{index:03d}"
+        duration = durations[index] if durations else 1.0
+        if outcome == "flaky":
+            history.record(run_id, nodeid, "rerun", duration, env, "chromium", "gw0", retry_count=0)
+            history.record(run_id, nodeid, "passed", duration, env, "chromium", "gw0", retry_count=1)
+        else:
+            history.record(run_id, nodeid, outcome, duration, env, "chromium", "gw0")
+    history.flush()
+
+
+@pytest.mark.all_tests
+def test_recent_collapses_rerun_attempts_into_one_row_per_run(history: RunHistory) -> None:
+    record_runs(history, ["passed", "flaky", "failed", "flaky"])
+
+    rows = history._recent(10, None, None)[NODEID]
+
+    assert [(row["run_id"], row["outcome"], row["retry_count"]) for row in rows] == [
+        ("run003", "passed", 1), ("run002", "failed", 0), ("run001", "passed", 1), ("run000", "passed", 0)]
+
+
+@pytest.mark.all_tests
+def test_recent_window_counts_runs_and_honours_filters(history: RunHistory) -> None:
+    record_runs(history, ["flaky"] * 6)
+    record_runs(history, ["passed"], nodeid="other", env="prod")
+
+    rows = history._recent(3, None, None)
+
+    assert [row["run_id"] for row in rows[NODEID]] == ["run005", "run004", "run003"]
+    assert list(history._recent(3, "prod", None)) == ["other"]
+    assert history._recent(3, None, "firefox") == {}
+
+
+@pytest.mark.all_tests
+def test_regressions_compare_the_latest_run_with_the_rolling_median(history: RunHistory) -> None:
+    record_runs(history, ["passed"] * 5, durations=[1.0, 1.1, 0.9, 1.0, 2.5])
+
+    [regression] = history.regressions(window=10)
+
+    assert regression["nodeid"] == NODEID
+    assert regression["latest"] == 2.5
+    assert regression["baseline"] == pytest.approx(1.0)
+
+
+@pytest.mark.all_tests
+def test_regressions_skip_tests_whose_latest_run_did_not_pass(history: RunHistory) -> None:
+    # The newest *passing* run is slow, but the latest run failed
+    record_runs(history, ["passed", "passed", "passed", "passed", "failed"], durations=[1.0, 1.0, 1.0, 3.0, 9.0])
+
+    assert history.regressions(window=10) == []
+
+
+@pytest.mark.all_tests
+def test_flake_rates_count_retried_passes_and_alternations(history: RunHistory) -> None:
+    # Newest first: passed, failed (between two passes), passed, passed after retry, passed
+    record_runs(history, ["passed", "flaky", "passed", "failed", "passed"])
+
+    [rate] = history.flake_rates(window=20)
+
+    assert rate == {"nodeid": NODEID, "flake_rate": 2 / 5, "failures": 1, "runs": 5}
+
+
+@pytest.mark.all_tests
+def test_flake_rates_ignore_a_test_that_was_broken_and_then_fixed(history: RunHistory) -> None:
+    record_runs(history, ["failed"] * 10 + ["passed"] * 10)
+
+    assert history.flake_rates(window=20) == []
@@ -0,0 +1,63 @@
+"""Contract validation helpers - schemas from apis/schemas.py, responses built locally"""
+import json
+from typing import Any, Dict
+
+import pytest
+from requests import Response
+
+from utils.schema_validator import get_validator, validate_json, validate_response
+
+NOTE: Dict[str, Any] = {
+    "id": "64b7c5f1e4b0a1b2c3d4e5f6", "title": "Groceries", "description": "Milk", "category": "Home",
+    "completed": False, "created_at": "2025-01-01T10:00:00.000Z", "updated_at": "2025-01-01T10:00:00.000Z",
+    "user_id": "64b7c5f1e4b0a1b2c3d4e5f0",
+}
+ERROR: Dict[str, Any] = {"success": False, "status": 404, "message": "No note was found with the provided ID"}
+
+
+def envelope(data: Any) -> Dict[str, Any]:
+    return {"success": True, "status": 200, "message": "OK", "data": data}
+
+
+def response(status: int, body: Any) -> Response:
+    built = Response()
+    built.status_code = status
+    built._content = json.dumps(body).encode()
+    return built
+
+
+@pytest.mark.all_tests
+def test_valid_payloads_pass_and_are_returned() -> None:
+    assert validate_json(envelope([NOTE, NOTE]), "get_notes") == envelope([NOTE, NOTE])
+    assert validate_json(envelope(NOTE), "get_note") == envelope(NOTE)
+    assert validate_json(ERROR, "error") == ERROR
+
+
+@pytest.mark.all_tests
+@pytest.mark.parametrize("payload, schema_name", [
+    (envelope([{**NOTE, "category": "Garden"}]), "get_notes"),
+    (envelope({key: value for key, value in NOTE.items() if key != "title"}), "get_note"),
+    (envelope({**NOTE, "completed": "no"}), "get_note"),
+    ({"success": True, "status": 200, "message": "OK"}, "get_notes"),
+])
+def test_invalid_payloads_fail_with_an_assertion(payload: Any, schema_name: str) -> None:
+    with pytest.raises(AssertionError, match=f"Response does not match '{schema_name}' schema"):
+        validate_json(payload, schema_name)
+
+
+@pytest.mark.all_tests
+def test_validators_are_compiled_once_and_unknown_schemas_rejected() -> None:
+    assert get_validator("get_notes") is get_validator("get_notes")
+    with pytest.raises(ValueError, match="Schema 'get_todos' not defined"):
+        get_validator("get_todos")
+
+
+@pytest.mark.all_tests
+def test_validate_response_requires_success_unless_a_status_is_expected() -> None:
+    assert validate_response(response(200, envelope(NOTE)), "get_note") == envelope(NOTE)
+    with pytest.raises(AssertionError, match="Expected a 2xx response for 'get_note', got 404"):
+        validate_response(response(404, ERROR), "get_note")
+
+    assert validate_response(response(404, ERROR), "get_note", expected_status=404) == ERROR
+    with pytest.raises(AssertionError, match="Expected status 404 for 'get_note', got 200"):
+        validate_response(response(200, envelope(NOTE)), "get_note", expected_status=404)
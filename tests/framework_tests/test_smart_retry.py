@@ -0,0 +1,143 @@
+"""
+In-place retry (tests/conftest.py + utils/smart_retry.py) exercised through pytester
+
+The retry hooks drive pytest's private runtestprotocol and rely on RetryNextItem
+keeping session fixtures alive between attempts, so these tests pin that behaviour
+against the installed pytest version. Each run happens in a subprocess because the
+hooks keep module-level state in tests.conftest.
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from utils.run_history import RunHistory
+
+pytest_plugins = ["pytester"]
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+CONFTEST = """
+from tests.conftest import *  # noqa: F401,F403 - the repo's hooks and fixtures
+import pytest
+
+
+def log(event):
+    with open("events.txt", "a") as f:
+        f.write(event + "\\n")
+
+
+@pytest.fixture(scope="session")
+def shared():
+    log("session setup")
+    yield
+    log("session teardown")
+
+
+@pytest.fixture
+def per_test():
+    log("function setup")
+    yield
+    log("function teardown")
+"""
+
+RETRY_ARGS = ["-p", "no:cacheprovider", "--no-run-history", "--retry-backoff", "0"]
+
+
+@pytest.fixture
+def retry_pytester(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> pytest.Pytester:
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    pytester.makeconftest(CONFTEST)
+    return pytester
+
+
+def events(pytester: pytest.Pytester) -> list:
+    return (pytester.path / "events.txt").read_text().splitlines()
+
+
+@pytest.mark.all_tests
+def test_flaky_test_is_retried_with_session_fixture_kept_warm(retry_pytester: pytest.Pytester) -> None:
+    retry_pytester.makepyfile("""
+        import pytest
+        from pathlib import Path
+
+        @pytest.mark.flaky(retries=2)
+        def test_flaky(shared, per_test):
+            marker = Path("attempted")
+            if not marker.exists():
+                marker.touch()
+                assert False, "first attempt fails"
+    """)
+    result = retry_pytester.runpytest_subprocess(*RETRY_ARGS, "-v")
+
+    result.assert_outcomes(passed=1)
+    assert result.parseoutcomes()["rerun"] == 1
+    result.stdout.fnmatch_lines(["*test_flaky RERUN*", "*test_flaky PASSED*"])
+    assert events(retry_pytester) == [
+        "session setup",
+        "function setup", "function teardown",
+        "function setup", "function teardown",
+        "session teardown",
+    ]
+
+
+@pytest.mark.all_tests
+def test_retry_budget_is_shared_by_the_session(retry_pytester: pytest.Pytester) -> None:
+    retry_pytester.makepyfile("""
+        import pytest
+
+        @pytest.mark.flaky(retries=3)
+        def test_first(per_test):
+            assert False
+
+        @pytest.mark.flaky(retries=3)
+        def test_second(per_test):
+            assert False
+    """)
+    result = retry_pytester.runpytest_subprocess(*RETRY_ARGS, "--retry-budget", "1")
+
+    result.assert_outcomes(failed=2)
+    assert result.parseoutcomes()["rerun"] == 1
+    assert events(retry_pytester).count("function setup") == 3
+
+
+@pytest.mark.all_tests
+def test_setup_error_in_session_fixture_is_not_retried(retry_pytester: pytest.Pytester) -> None:
+    retry_pytester.makepyfile("""
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def broken_browser():
+            raise RuntimeError("browser failed to launch")
+
+        @pytest.mark.flaky(retries=2)
+        def test_needs_browser(broken_browser):
+            pass
+    """)
+    result = retry_pytester.runpytest_subprocess(*RETRY_ARGS)
+
+    result.assert_outcomes(errors=1)
+    assert "rerun" not in result.parseoutcomes()
+
+
+@pytest.mark.all_tests
+def test_flaky_test_from_history_is_retried_whatever_the_browser_name_case(retry_pytester: pytest.Pytester) -> None:
+    history = RunHistory(retry_pytester.path / "history.db")
+    for run, outcome in enumerate(["passed", "failed", "passed"]):
+        history.record(f"run{run}", "test_from_history.py::test_unmarked", outcome, 0.1, "qa", "chromium", "gw0")
+    history.close()
+    retry_pytester.makepyfile(test_from_history="""
+        from pathlib import Path
+
+        def test_unmarked():
+            marker = Path("attempted")
+            if not marker.exists():
+                marker.touch()
+                assert False, "first attempt fails"
+    """)
+    result = retry_pytester.runpytest_subprocess(*RETRY_ARGS, "--run-history-db", "history.db",
+                                                 "--retry-flaky-from-history", "0.1",
+                                                 "--env", "qa", "--browser-name", "Chromium")
+
+    result.assert_outcomes(passed=1)
+    assert result.parseoutcomes()["rerun"] == 1
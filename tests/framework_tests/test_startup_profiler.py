@@ -0,0 +1,36 @@
+"""StartupProfiler must see imports made by conftests and test modules, not only pytest's own"""
+from pathlib import Path
+
+import pytest
+
+from utils.startup_profiler import StartupProfiler
+
+
+@pytest.mark.all_tests
+def test_watched_package_imported_from_conftest_is_reported_loaded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+                                                                   capsys: pytest.CaptureFixture) -> None:
+    # A stand-in "pages" package, so the check does not depend on Playwright being installed
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "pages" / "__init__.py").write_text("")
+    (tmp_path / "conftest.py").write_text("import pages  # noqa: F401\n")
+    (tmp_path / "test_sample.py").write_text("def test_sample():\n    pass\n")
+    monkeypatch.chdir(tmp_path)
+
+    modules = StartupProfiler(["-q"]).report()
+
+    assert "pages" in modules
+    report_lines = capsys.readouterr().out.splitlines()
+    assert any(line.split() == ["pages", "LOADED", "(1", "modules)"] for line in report_lines)
+
+
+@pytest.mark.all_tests
+def test_parse_keeps_the_largest_cumulative_time() -> None:
+    raw = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        150 |   sqlite3",
+        "import time:        10 |        900 | utils.run_history",
+        "import time:         5 |         40 |   sqlite3",
+        "some other stderr line",
+    ])
+
+    assert StartupProfiler.parse(raw) == {"sqlite3": (120, 150), "utils.run_history": (10, 900)}
@@ -0,0 +1,160 @@
+"""VisualComparator on synthetic screenshots - pure Pillow/NumPy, no browser needed"""
+import io
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+from PIL import Image, ImageDraw
+
+from utils.config import config
+from utils.visual_compare import MASK_TILE, SPARSE_MAX_PIXELS, TILE_SCAN_MAX, VisualComparator
+
+# Deliberately not a multiple of MASK_TILE, so the last tile row/column is partial
+WIDTH, HEIGHT = 331, 251
+BACKGROUND = (250, 250, 250)
+
+
+def page_image() -> Image.Image:
+    """Page-like screenshot: light background, a header bar, text-like lines and a block"""
+    image = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, WIDTH - 1, 30], fill=(40, 60, 120))
+    for y in range(50, 200, 12):
+        draw.line([(20, y), (20 + (y * 7) % 200 + 60, y)], fill=(30, 30, 30), width=2)
+    draw.rectangle([240, 60, 310, 180], fill=(200, 120, 40))
+    return image
+
+
+def png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def with_pixels(image: Image.Image, *pixels: Tuple[int, int, Tuple[int, int, int]]) -> Image.Image:
+    changed = image.copy()
+    for x, y, colour in pixels:
+        changed.putpixel((x, y), colour)
+    return changed
+
+
+@pytest.fixture
+def comparator() -> VisualComparator:
+    # No tolerance, so a single differing pixel fails
+    return VisualComparator(max_diff_ratio=0.0)
+
+
+@pytest.fixture
+def baseline() -> Image.Image:
+    return page_image()
+
+
+@pytest.mark.all_tests
+def test_identical_screenshots_match_without_decoding(comparator: VisualComparator, baseline: Image.Image) -> None:
+    data = png(baseline)
+
+    result = comparator.compare("page", data, data)
+
+    assert result.matched and result.reason == "identical"
+    assert result.diff_image is None
+
+
+@pytest.mark.all_tests
+def test_size_mismatch_fails(comparator: VisualComparator, baseline: Image.Image) -> None:
+    result = comparator.compare("page", png(baseline.crop((0, 0, WIDTH, HEIGHT - 1))), png(baseline))
+
+    assert not result.matched
+    assert result.reason == f"size mismatch: actual {WIDTH}x{HEIGHT - 1}, baseline {WIDTH}x{HEIGHT}"
+
+
+@pytest.mark.all_tests
+def test_grossly_different_page_fails_on_the_hash(comparator: VisualComparator, baseline: Image.Image) -> None:
+    actual = baseline.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+
+    result = comparator.compare("page", png(actual), png(baseline))
+
+    assert not result.matched
+    assert result.reason.startswith("perceptual hash distance")
+    assert result.hash_distance > comparator.hash_threshold
+    assert result.diff_pixels == 0 and result.diff_image is not None
+
+
+@pytest.mark.all_tests
+def test_single_pixel_change_is_found(comparator: VisualComparator, baseline: Image.Image) -> None:
+    actual = with_pixels(baseline, (150, 220, (0, 0, 0)))
+
+    result = comparator.compare("page", png(actual), png(baseline))
+
+    assert not result.matched
+    assert result.diff_pixels == 1
+    assert result.diff_image is not None
+
+
+@pytest.mark.all_tests
+@pytest.mark.parametrize("delta, expected", [(20, 0), (30, 1)])
+def test_single_channel_change_respects_pixel_threshold(comparator: VisualComparator, baseline: Image.Image,
+                                                        delta: int, expected: int) -> None:
+    red, green, blue = BACKGROUND
+    assert baseline.getpixel((150, 220)) == BACKGROUND
+    actual = with_pixels(baseline, (150, 220, (red, green, blue - delta)))
+
+    result = comparator.compare("page", png(actual), png(baseline))
+
+    assert result.diff_pixels == expected
+
+
+@pytest.mark.all_tests
+def test_ignore_region_excludes_changes(comparator: VisualComparator, baseline: Image.Image) -> None:
+    actual = with_pixels(baseline, (100, 100, (255, 0, 0)), (101, 101, (255, 0, 0)), (5, 240, (255, 0, 0)))
+
+    result = comparator.compare("page", png(actual), png(baseline), ignore_regions=[(90, 90, 20, 20)])
+
+    assert result.diff_pixels == 1
+
+
+@pytest.mark.all_tests
+def test_one_pixel_shift_is_treated_as_anti_aliasing(comparator: VisualComparator) -> None:
+    def vertical_line(x: int) -> Image.Image:
+        image = page_image()
+        ImageDraw.Draw(image).line([(x, 40), (x, 230)], fill=(0, 0, 0))
+        return image
+
+    result = comparator.compare("page", png(vertical_line(201)), png(vertical_line(200)))
+
+    assert result.matched
+    assert result.diff_pixels == 0
+
+
+@pytest.mark.all_tests
+def test_changes_in_partial_edge_tiles_are_found(comparator: VisualComparator, baseline: Image.Image) -> None:
+    corners = [(WIDTH - 1, HEIGHT - 1, (255, 0, 0)), (WIDTH - 1, 0, (0, 255, 0)),
+               (0, HEIGHT - 1, (0, 0, 255)), (WIDTH - 1, HEIGHT // 2, (255, 0, 255))]
+    actual = with_pixels(baseline, *corners)
+
+    result = comparator.compare("page", png(actual), png(baseline))
+
+    assert result.diff_pixels == len(corners)
+
+
+@pytest.mark.all_tests
+def test_many_scattered_changes_use_the_full_scan(comparator: VisualComparator, baseline: Image.Image) -> None:
+    # More changed tiles than TILE_SCAN_MAX and more pixels than the sparse neighbourhood path reads
+    step = MASK_TILE
+    pixels = [(x, y, (255, 0, 255)) for x in range(8, WIDTH, step) for y in range(40, HEIGHT, step)]
+    assert len(pixels) > max(TILE_SCAN_MAX, SPARSE_MAX_PIXELS)
+    actual = with_pixels(baseline, *pixels)
+
+    result = comparator.compare("page", png(actual), png(baseline))
+
+    assert result.diff_pixels == len(pixels)
+
+
+@pytest.mark.all_tests
+def test_compare_to_baseline_reads_the_stored_file(tmp_path: Path, baseline: Image.Image) -> None:
+    comparator = VisualComparator(max_diff_ratio=0.0, baseline_root=tmp_path)
+    path = comparator.save_baseline("checkout", png(baseline))
+
+    assert path == tmp_path / config.current_env / config.current_browser / "checkout.png"
+    assert comparator.compare_to_baseline("checkout", png(baseline)).reason == "identical"
+    changed = with_pixels(baseline, (10, 245, (255, 0, 0)))
+    assert comparator.compare_to_baseline("checkout", png(changed)).diff_pixels == 1
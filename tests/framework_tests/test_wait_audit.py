@@ -0,0 +1,166 @@
+"""WaitAuditor flagging and summary on fake Page/Locator targets - no browser needed"""
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from utils.config import config
+from utils.wait_audit import TIMEOUT_HEADROOM_MIN_CALLS, WaitAuditor
+
+
+# _record keys call names on the target's class name, so the fakes mirror Playwright's
+class Page:
+    def __init__(self, ready_state: str = "complete"):
+        self.ready_state = ready_state
+
+    def evaluate(self, expression: str) -> str:
+        return self.ready_state
+
+    def wait_for_load_state(self, state: str = "load") -> None:
+        pass
+
+
+class Locator:
+    def is_visible(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def auditor() -> WaitAuditor:
+    auditor = WaitAuditor()
+    auditor.start_test("tests/ui_tests/test_cart.py::test_add_item_to_cart")
+    return auditor
+
+
+def flags(auditor: WaitAuditor) -> List[List[str]]:
+    return [record["flags"] for record in auditor.records]
+
+
+@pytest.mark.all_tests
+def test_load_wait_before_locator_wait_is_stacked(auditor: WaitAuditor) -> None:
+    # CartPage.proceed_to_checkout: click, wait_for_load_state("load"), locator.wait_for(state="visible")
+    auditor._record(Locator(), "click", "action", (), {}, 120.0, None)
+    auditor._record(Page(), "wait_for_load_state", "wait", ("load",), {}, 300.0, False)
+    auditor._record(Locator(), "wait_for", "wait", (), {"state": "visible"}, 40.0, False)
+
+    assert flags(auditor) == [[], ["stacked"], []]
+
+    auditor.finish_test()
+    test = auditor.tests["tests/ui_tests/test_cart.py::test_add_item_to_cart"]
+    # Stacked is reported, not counted: the overlap with the locator's auto-wait is unknown
+    assert test["wait_ms"] == 340.0
+    assert test["wasted_ms"] == 0.0
+
+
+@pytest.mark.all_tests
+def test_networkidle_wait_before_locator_action_is_not_stacked(auditor: WaitAuditor) -> None:
+    auditor._record(Page(), "wait_for_load_state", "wait", ("networkidle",), {}, 800.0, None)
+    auditor._record(Locator(), "click", "action", (), {}, 50.0, None)
+
+    assert flags(auditor) == [[], []]
+
+
+@pytest.mark.all_tests
+def test_already_satisfied_and_hard_sleep_count_as_wasted(auditor: WaitAuditor) -> None:
+    auditor.slow_mo_ms = 100
+    auditor._record(Page(), "wait_for_load_state", "wait", ("load",), {}, 15.0, True)
+    auditor._record(Page(), "click", "action", (), {}, 30.0, None)
+    auditor._record(Page(), "wait_for_timeout", "wait", (500,), {}, 501.0, None)
+
+    assert flags(auditor) == [["already_satisfied"], [], ["hard_sleep"]]
+    assert auditor.records[2]["timeout_ms"] == 500
+    assert auditor.records[2]["timeout_source"] is None
+
+    auditor.finish_test()
+    test = auditor.tests["tests/ui_tests/test_cart.py::test_add_item_to_cart"]
+    assert test["wasted_ms"] == 516.0
+    assert test["slow_mo_overhead_ms"] == 100
+
+
+@pytest.mark.all_tests
+def test_record_keeps_the_effective_timeout_and_its_source(auditor: WaitAuditor) -> None:
+    auditor._record(Locator(), "wait_for", "wait", (), {}, 10.0, False)
+    auditor._record(Locator(), "wait_for", "wait", (), {"timeout": 5000}, 10.0, False)
+
+    assert [(r["timeout_ms"], r["timeout_source"]) for r in auditor.records] == \
+        [(config.timeout, "default"), (5000, "explicit")]
+    assert auditor.records[0]["site"].startswith("tests/framework_tests/test_wait_audit.py:")
+
+
+@pytest.mark.all_tests
+@pytest.mark.parametrize("ready_state, expected", [("complete", True), ("loading", False)])
+def test_probe_checks_document_ready_state(ready_state: str, expected: bool) -> None:
+    assert WaitAuditor._probe(Page(ready_state), "wait_for_load_state", ("load",), {}) is expected
+    assert WaitAuditor._probe(Page(ready_state), "wait_for_load_state", ("networkidle",), {}) is None
+
+
+@pytest.mark.all_tests
+def test_wrapper_probes_times_and_records_only_inside_a_test() -> None:
+    auditor = WaitAuditor()
+    wrapped = auditor._wrap(Page.wait_for_load_state, "wait_for_load_state", "wait")
+
+    wrapped(Page(), "load")
+    assert auditor.records == []
+
+    auditor.start_test("test_wrapped")
+    wrapped(Page("complete"), "load")
+    assert [(r["call"], r["flags"]) for r in auditor.records] == [("Page.wait_for_load_state", ["already_satisfied"])]
+
+
+def wait_record(duration_ms: float, timeout_source: Optional[str] = "default", timeout_ms: int = 30000,
+                site: str = "pages/cart_page.py:25", call: str = "Locator.wait_for",
+                record_flags: Any = ()) -> Dict[str, Any]:
+    return {"site": site, "call": call, "kind": "wait", "state": None, "duration_ms": duration_ms,
+            "timeout_ms": timeout_ms, "timeout_source": timeout_source, "flags": list(record_flags)}
+
+
+def audit_result(records: List[Dict[str, Any]], wasted_ms: float = 0.0) -> Dict[str, Any]:
+    return {"records": records, "wasted_ms": wasted_ms, "slow_mo_overhead_ms": 0}
+
+
+@pytest.mark.all_tests
+def test_summarize_flags_default_timeout_headroom_after_enough_calls() -> None:
+    calls = TIMEOUT_HEADROOM_MIN_CALLS
+    tests = {
+        "test_a": audit_result([wait_record(100.0 + i) for i in range(calls)]),
+        "test_b": audit_result([wait_record(200.0, site="pages/cart_page.py:24",
+                                           call="Page.wait_for_load_state")] * (calls - 1)),
+    }
+
+    summary = WaitAuditor.summarize(tests)
+    sites = dict(summary["sites"])
+
+    flagged = sites["pages/cart_page.py:25 Locator.wait_for"]
+    assert flagged["flags"] == {"timeout_headroom": calls}
+    assert flagged["timeout_source"] == "default"
+    assert flagged["p95_ms"] == 100.0 + calls - 1
+    assert WaitAuditor._flag_label("timeout_headroom", flagged).startswith("timeout_headroom (default timeout 30000ms")
+    # Too few calls to judge
+    assert sites["pages/cart_page.py:24 Page.wait_for_load_state"]["flags"] == {}
+    assert summary["tests"] == 2
+    assert summary["blocked_ms"] == round(sum(100.0 + i for i in range(calls)) + 200.0 * (calls - 1), 2)
+
+
+@pytest.mark.all_tests
+def test_summarize_labels_explicit_timeouts_and_skips_sleeps() -> None:
+    calls = TIMEOUT_HEADROOM_MIN_CALLS
+    tests = {
+        "test_a": audit_result(
+            [wait_record(50.0, timeout_source="explicit", timeout_ms=10000)] * calls
+            + [wait_record(500.0, timeout_source=None, timeout_ms=500, site="pages/cart_page.py:30",
+                           call="Page.wait_for_timeout", record_flags=["hard_sleep"])] * calls,
+            wasted_ms=500.0 * calls),
+    }
+
+    summary = WaitAuditor.summarize(tests)
+    sites = dict(summary["sites"])
+
+    explicit = sites["pages/cart_page.py:25 Locator.wait_for"]
+    assert explicit["flags"] == {"timeout_headroom": calls}
+    assert explicit["timeout_source"] == "explicit"
+    assert WaitAuditor._flag_label("timeout_headroom", explicit).startswith("timeout_headroom (explicit 10000ms")
+    sleep = sites["pages/cart_page.py:30 Page.wait_for_timeout"]
+    assert sleep["flags"] == {"hard_sleep": calls}
+    assert sleep["wasted_ms"] == 500.0 * calls
+    assert summary["wasted_ms"] == 500.0 * calls
+    # Ranked by blocked time
+    assert summary["sites"][0][0] == "pages/cart_page.py:30 Page.wait_for_timeout"
@@ -1,6 +1,13 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import allure
 import pytest
-from pages.cart_page import CartPage
+
+if TYPE_CHECKING:
+    # Type-only import: keeps Playwright out of collection for API-only runs
+    from pages.cart_page import CartPage
 
 
 @allure.epic("E-Commerce Application")
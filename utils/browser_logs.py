@@ -0,0 +1,115 @@
+# utils/browser_logs.py
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+# Session totals, fed from test reports so the xdist controller sees every worker's tests
+SESSION_STATS = {"tests": 0, "events": 0, "handler_ns": 0}
+
+
+class BrowserLogCapture:
+    """
+    Bounded per-test capture of console messages, uncaught page errors and failed requests
+
+    Event handlers only append small tuples to ring buffers (deque with maxlen) and bump
+    counters - nothing is formatted or printed until serialize() is called on failure.
+    Time spent inside the handlers is measured so the overhead can be reported.
+
+    4xx/5xx responses are only captured with http_errors=True: that needs a "response"
+    listener, which makes Playwright dispatch every response of the page to Python - a
+    cost paid in the driver connection, not inside the handler, so handler_ns cannot show it.
+    """
+
+    def __init__(self, page, capacity: int = 200, http_errors: bool = False):
+        self.page = page
+        self.start = time.monotonic()
+        self.console: Deque[Tuple[float, str, str]] = deque(maxlen=capacity)
+        self.page_errors: Deque[Tuple[float, str, str]] = deque(maxlen=capacity)
+        self.network: Deque[Tuple[float, str, str, Any]] = deque(maxlen=capacity)
+        self.counts = {"console": 0, "console_errors": 0, "page_errors": 0, "failed_requests": 0}
+        self.handler_ns = 0
+
+        self._listeners = [("console", self._on_console), ("pageerror", self._on_page_error),
+                           ("requestfailed", self._on_request_failed)]
+        if http_errors:
+            self._listeners.append(("response", self._on_response))
+        for event, handler in self._listeners:
+            page.on(event, handler)
+
+    def _on_console(self, message):
+        started = time.perf_counter_ns()
+        message_type = message.type
+        self.counts["console"] += 1
+        if message_type == "error":
+            self.counts["console_errors"] += 1
+        self.console.append((time.monotonic(), message_type, message.text))
+        self.handler_ns += time.perf_counter_ns() - started
+
+    def _on_page_error(self, error):
+        started = time.perf_counter_ns()
+        self.counts["page_errors"] += 1
+        self.page_errors.append((time.monotonic(), getattr(error, "name", "Error"), getattr(error, "message", str(error))))
+        self.handler_ns += time.perf_counter_ns() - started
+
+    def _on_request_failed(self, request):
+        started = time.perf_counter_ns()
+        self.counts["failed_requests"] += 1
+        self.network.append((time.monotonic(), request.method, request.url, request.failure))
+        self.handler_ns += time.perf_counter_ns() - started
+
+    def _on_response(self, response):
+        started = time.perf_counter_ns()
+        status = response.status
+        if status >= 400:
+            self.counts["failed_requests"] += 1
+            self.network.append((time.monotonic(), response.request.method, response.url, status))
+        self.handler_ns += time.perf_counter_ns() - started
+
+    @property
+    def js_error_count(self) -> int:
+        return self.counts["page_errors"] + self.counts["console_errors"]
+
+    def detach(self):
+        """Stop listening"""
+        for event, handler in self._listeners:
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+    def overhead(self) -> Tuple[int, int]:
+        """(events, handler_ns) for this test - small enough to travel on a test report"""
+        return self.counts["console"] + self.counts["page_errors"] + self.counts["failed_requests"], self.handler_ns
+
+    def serialize(self) -> str:
+        """JSON snapshot of the buffers (timestamps relative to test start) and the total counts"""
+        def offset(timestamp: float) -> float:
+            return round((timestamp - self.start) * 1000, 1)
+
+        snapshot: Dict[str, Any] = {
+            "counts": self.counts,
+            "capture_overhead_ms": round(self.handler_ns / 1e6, 3),
+            "console": [{"t_ms": offset(t), "type": kind, "text": text} for t, kind, text in self.console],
+            "page_errors": [{"t_ms": offset(t), "name": name, "message": message}
+                            for t, name, message in self.page_errors],
+            "network": [{"t_ms": offset(t), "method": method, "url": url, "failure": failure}
+                        for t, method, url, failure in self.network],
+        }
+        return json.dumps(snapshot, indent=2, default=str)
+
+
+def add_to_session(events: int, handler_ns: int):
+    """Add one test's capture figures to the session totals"""
+    SESSION_STATS["tests"] += 1
+    SESSION_STATS["events"] += events
+    SESSION_STATS["handler_ns"] += handler_ns
+
+
+def session_overhead_summary() -> str:
+    """One-line summary of capture cost for the session"""
+    tests = SESSION_STATS["tests"]
+    total_ms = SESSION_STATS["handler_ns"] / 1e6
+    per_test = total_ms / tests if tests else 0.0
+    return (f"Browser log capture: {SESSION_STATS['events']} events over {tests} tests, "
+            f"{total_ms:.2f}ms in handlers ({per_test:.3f}ms/test)")
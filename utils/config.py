@@ -35,10 +35,13 @@ class Config:
     # Default values
     DEFAULT_ENV = 'qa'
     DEFAULT_TEST_TYPE = 'ui'
+    DEFAULT_BROWSER = 'chromium'
 
     def __init__(self):
         self._current_env = self.DEFAULT_ENV
         self._current_test_type = self.DEFAULT_TEST_TYPE
+        self._current_browser = self.DEFAULT_BROWSER
+        self._update_baselines = False
 
     def set_environment(self, env: str):
         """Set the current environment"""
@@ -52,6 +55,14 @@ class Config:
             raise ValueError(f"Test type '{test_type}' not supported. Available: ['ui', 'api']")
         self._current_test_type = test_type.lower()
 
+    def set_browser(self, browser_name: str):
+        """Set the current browser (used e.g. to separate visual baselines)"""
+        self._current_browser = browser_name.lower()
+
+    def set_update_baselines(self, update: bool):
+        """Overwrite visual baselines with the current screenshots instead of comparing"""
+        self._update_baselines = bool(update)
+
     @property
     def current_env(self) -> str:
         return self._current_env
@@ -60,6 +71,14 @@ class Config:
     def current_test_type(self) -> str:
         return self._current_test_type
 
+    @property
+    def current_browser(self) -> str:
+        return self._current_browser
+
+    @property
+    def update_baselines(self) -> bool:
+        return self._update_baselines
+
     @property
     def ui_base_url(self) -> str:
         return self.ENVIRONMENTS[self._current_env]['ui_base_url']
@@ -77,7 +96,8 @@ class Config:
         return self.ENVIRONMENTS[self._current_env]
 
     def __str__(self):
-        return f"Config(env={self._current_env}, test_type={self._current_test_type})"
+        return (f"Config(env={self._current_env}, test_type={self._current_test_type}, "
+                f"browser={self._current_browser})")
 
 
 # Global config instance
@@ -0,0 +1,205 @@
+# utils/run_history.py
+import argparse
+import sqlite3
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = Path("reports") / "run_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id      TEXT    NOT NULL,
+    recorded_at TEXT    NOT NULL,
+    nodeid      TEXT    NOT NULL,
+    outcome     TEXT    NOT NULL,
+    duration    REAL    NOT NULL,
+    env         TEXT    NOT NULL,
+    browser     TEXT    NOT NULL,
+    worker      TEXT    NOT NULL,
+    retry_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_results_nodeid ON results (nodeid, id);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id);
+"""
+
+INSERT_SQL = """
+INSERT INTO results (run_id, recorded_at, nodeid, outcome, duration, env, browser, worker, retry_count)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class RunHistory:
+    """
+    Append-only SQLite store of test results shared by all xdist workers
+
+    Results are buffered and written with one executemany per batch. WAL mode and
+    a busy timeout let several workers append to the same file concurrently.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH, batch_size: int = 50):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self._buffer: List[Tuple] = []
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.db_path), timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def record(self, run_id: str, nodeid: str, outcome: str, duration: float,
+               env: str, browser: str, worker: str, retry_count: int = 0):
+        """Buffer one result; the buffer is flushed once it reaches batch_size"""
+        self._buffer.append((run_id, datetime.now().isoformat(timespec="seconds"), nodeid, outcome,
+                             round(duration, 4), env, browser, worker, retry_count))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        with self.connection:
+            self.connection.executemany(INSERT_SQL, self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    # ------------------------------------------------------------------ queries
+    def _recent(self, window: int, env: Optional[str], browser: Optional[str]) -> Dict[str, List[sqlite3.Row]]:
+        """
+        Final result of each of the last `window` runs per nodeid (newest first), optionally filtered
+
+        Retried attempts ('rerun' rows) are left out, so a window counts runs, not attempts.
+        """
+        filters, params = ["outcome != 'rerun'"], []
+        if env:
+            filters.append("env = ?")
+            params.append(env)
+        if browser:
+            filters.append("browser = ?")
+            params.append(browser)
+        where = f"WHERE {' AND '.join(filters)}"
+
+        self.connection.row_factory = sqlite3.Row
+        rows = self.connection.execute(f"""
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY id DESC) AS position
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY nodeid, run_id ORDER BY id DESC) AS in_run
+                    FROM results {where}
+                ) WHERE in_run = 1
+            ) WHERE position <= ? ORDER BY nodeid, position
+        """, (*params, window)).fetchall()
+
+        grouped: Dict[str, List[sqlite3.Row]] = {}
+        for row in rows:
+            grouped.setdefault(row["nodeid"], []).append(row)
+        return grouped
+
+    def slowest(self, limit: int = 10, window: int = 10,
+                env: Optional[str] = None, browser: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Tests ranked by median duration over their last `window` passing runs"""
+        stats = []
+        for nodeid, rows in self._recent(window, env, browser).items():
+            durations = [row["duration"] for row in rows if row["outcome"] == "passed"]
+            if durations:
+                stats.append({"nodeid": nodeid, "median": statistics.median(durations),
+                              "max": max(durations), "runs": len(durations)})
+        return sorted(stats, key=lambda stat: stat["median"], reverse=True)[:limit]
+
+    def regressions(self, window: int = 10, threshold: float = 1.5, min_delta: float = 0.5,
+                    env: Optional[str] = None, browser: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Tests whose duration in their latest run exceeds the rolling baseline
+
+        The latest run must have passed; the baseline is the median of the passing runs among
+        the previous `window`. A test regresses when latest >= baseline * threshold and the
+        difference is at least min_delta seconds.
+        """
+        found = []
+        for nodeid, rows in self._recent(window + 1, env, browser).items():
+            if rows[0]["outcome"] != "passed":
+                continue
+            previous = [row["duration"] for row in rows[1:] if row["outcome"] == "passed"]
+            if len(previous) < 2:
+                continue
+            latest, baseline = rows[0]["duration"], statistics.median(previous)
+            if latest >= baseline * threshold and latest - baseline >= min_delta:
+                found.append({"nodeid": nodeid, "latest": latest, "baseline": baseline,
+                              "ratio": latest / baseline if baseline else float("inf")})
+        return sorted(found, key=lambda item: item["ratio"], reverse=True)
+
+    def flake_rates(self, window: int = 20, min_runs: int = 3,
+                    env: Optional[str] = None, browser: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Flake rate per test over its last `window` runs
+
+        A run counts as flaky when it passed only after a retry, or when its outcome differs
+        from both neighbouring runs (a failure between two passes, or a pass between two
+        failures). A single switch - broken for a while, then fixed - is not flakiness.
+        """
+        rates = []
+        for nodeid, rows in self._recent(window, env, browser).items():
+            outcomes = [row for row in rows if row["outcome"] in ("passed", "failed")]
+            if len(outcomes) < min_runs:
+                continue
+            flaky_runs = {i for i, row in enumerate(outcomes) if row["outcome"] == "passed" and row["retry_count"] > 0}
+            flaky_runs |= {i for i in range(1, len(outcomes) - 1)
+                           if outcomes[i - 1]["outcome"] != outcomes[i]["outcome"] != outcomes[i + 1]["outcome"]}
+            flaky = len(flaky_runs)
+            failures = sum(1 for row in outcomes if row["outcome"] == "failed")
+            if flaky:
+                rates.append({"nodeid": nodeid, "flake_rate": flaky / len(outcomes),
+                              "failures": failures, "runs": len(outcomes)})
+        return sorted(rates, key=lambda rate: rate["flake_rate"], reverse=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI: python -m utils.run_history {slowest,regressions,flaky} [options]"""
+    parser = argparse.ArgumentParser(description="Query the local test run history")
+    parser.add_argument("query", choices=["slowest", "regressions", "flaky"])
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="Path to the history database")
+    parser.add_argument("--env", help="Only consider results from this environment")
+    parser.add_argument("--browser", help="Only consider results from this browser")
+    parser.add_argument("--window", type=int, help="Number of recent runs per test to consider")
+    parser.add_argument("--limit", type=int, default=10, help="Number of rows to show")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Regression ratio against the baseline")
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        print(f"❌ No run history found at: {args.db}")
+        return
+
+    history = RunHistory(args.db)
+    filters = {"env": args.env, "browser": args.browser}
+
+    if args.query == "slowest":
+        print(f"\n🐢 Slowest tests (median of passing runs):")
+        for stat in history.slowest(limit=args.limit, window=args.window or 10, **filters):
+            print(f"   {stat['median']:8.2f}s  (max {stat['max']:.2f}s, {stat['runs']} runs)  {stat['nodeid']}")
+    elif args.query == "regressions":
+        print(f"\n📈 Duration regressions (latest vs rolling median, >= {args.threshold}x):")
+        for item in history.regressions(window=args.window or 10, threshold=args.threshold, **filters)[:args.limit]:
+            print(f"   {item['ratio']:5.2f}x  {item['baseline']:.2f}s -> {item['latest']:.2f}s  {item['nodeid']}")
+    else:
+        print(f"\n🎲 Flaky tests:")
+        for rate in history.flake_rates(window=args.window or 20, **filters)[:args.limit]:
+            print(f"   {rate['flake_rate']:6.1%}  ({rate['failures']} failures / {rate['runs']} runs)  {rate['nodeid']}")
+
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
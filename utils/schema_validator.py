@@ -0,0 +1,48 @@
+# utils/schema_validator.py
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import fastjsonschema
+from requests import Response
+
+from apis.schemas import SCHEMAS
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_name: str) -> Callable[[Any], Any]:
+    """Compile the named schema once per process; later calls reuse the compiled validator"""
+    if schema_name not in SCHEMAS:
+        raise ValueError(f"Schema '{schema_name}' not defined. Available: {list(SCHEMAS.keys())}")
+    return fastjsonschema.compile(SCHEMAS[schema_name])
+
+
+def validate_json(data: Any, schema_name: str) -> Any:
+    """
+    Validate already-parsed JSON against a named schema
+
+    Raises:
+        AssertionError: With the failing path and rule, so it reads like any other test assertion
+    """
+    try:
+        return get_validator(schema_name)(data)
+    except fastjsonschema.JsonSchemaValueException as e:
+        raise AssertionError(f"Response does not match '{schema_name}' schema: {e.message}") from None
+
+
+def validate_response(response: Response, schema_name: str, expected_status: Optional[int] = None) -> Any:
+    """
+    Check the status, then parse and validate the body
+
+    Without expected_status the response must be a 2xx and match `schema_name`. With it, the
+    status must match exactly; an expected 4xx/5xx is validated against the 'error' contract.
+
+    Returns:
+        The parsed JSON body, so tests do not need to call response.json() again
+    """
+    status = response.status_code
+    if expected_status is None and not 200 <= status < 300:
+        raise AssertionError(f"Expected a 2xx response for '{schema_name}', got {status}: {response.text[:200]}")
+    if expected_status is not None and status != expected_status:
+        raise AssertionError(f"Expected status {expected_status} for '{schema_name}', got {status}: "
+                             f"{response.text[:200]}")
+    return validate_json(response.json(), "error" if status >= 400 else schema_name)
@@ -0,0 +1,84 @@
+# utils/smart_retry.py
+from typing import Iterable, Optional
+
+
+class SmartRetry:
+    """
+    In-place retry policy for flaky tests
+
+    A test is retried when it is marked @pytest.mark.flaky(retries=N) or its nodeid
+    was identified as flaky from the run history. Every retry consumes one unit of
+    the per-session budget (per xdist worker) and waits an exponential backoff.
+    """
+
+    def __init__(self, default_retries: int = 1, budget: int = 5, backoff: float = 1.0,
+                 flaky_nodeids: Iterable[str] = ()):
+        """
+        Args:
+            default_retries: Retries for history-identified tests and markers without a count
+            budget: Maximum number of retries for the whole session
+            backoff: Seconds before the first retry; doubled for every further retry
+            flaky_nodeids: Tests identified as flaky from the run history
+        """
+        self.default_retries = default_retries
+        self.budget = budget
+        self.backoff = backoff
+        self.flaky_nodeids = set(flaky_nodeids)
+        self.retries_used = 0
+
+    def retries_for(self, item) -> int:
+        """Number of retries the test is eligible for (0 = not retried)"""
+        marker = item.get_closest_marker("flaky")
+        if marker:
+            return int(marker.kwargs.get("retries", marker.args[0] if marker.args else self.default_retries))
+        if item.nodeid in self.flaky_nodeids:
+            return self.default_retries
+        return 0
+
+    def should_retry(self, item, when: str = "call") -> bool:
+        """
+        Whether a failure in phase `when` gets another attempt. A setup failure from a
+        higher-scoped fixture (e.g. the browser launch) is never retried: pytest caches
+        that error for the fixture's scope, so every attempt would fail the same way.
+        """
+        if when == "setup" and failed_in_shared_fixture(item):
+            return False
+        return getattr(item, "retry_attempt", 0) < self.retries_for(item) and self.retries_used < self.budget
+
+    def consume(self, item) -> float:
+        """Book a retry for the item and return the backoff delay in seconds"""
+        self.retries_used += 1
+        item.retry_attempt = getattr(item, "retry_attempt", 0) + 1
+        return self.backoff * 2 ** (item.retry_attempt - 1)
+
+
+def failed_in_shared_fixture(item) -> bool:
+    """True when one of the item's class/module/package/session fixtures has a cached setup error"""
+    for fixturedefs in item._fixtureinfo.name2fixturedefs.values():
+        for fixturedef in fixturedefs:
+            cached = fixturedef.cached_result
+            if fixturedef.scope != "function" and cached is not None and cached[2] is not None:
+                return True
+    return False
+
+
+class RetryNextItem:
+    """
+    `nextitem` stand-in passed to the teardown of a retryable attempt
+
+    While a retry is pending only the test's own function-scoped fixtures (page,
+    context) are torn down, so session fixtures - browser, auth token - stay warm
+    for the next attempt. Otherwise it behaves like the real next item.
+    """
+
+    def __init__(self, item, nextitem: Optional[object]):
+        self.item = item
+        self.nextitem = nextitem
+
+    def listchain(self):
+        if getattr(self.item, "retry_pending", False):
+            return self.item.listchain()[:-1]
+        return self.nextitem.listchain() if self.nextitem is not None else []
+
+    def __bool__(self):
+        return getattr(self.item, "retry_pending", False) or self.nextitem is not None
@@ -0,0 +1,74 @@
+# utils/startup_profiler.py
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Lines emitted by `python -X importtime`:
+# "import time:      self [us] |  cumulative | imported package"
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+# Heavy packages we want to keep out of API-only runs
+WATCHED_PACKAGES = ["playwright", "greenlet", "pyee", "allure", "pages", "utils.page_manager"]
+
+
+class StartupProfiler:
+    """Measure pytest startup/collection cost using `python -X importtime`"""
+
+    def __init__(self, pytest_args: Optional[List[str]] = None):
+        self.pytest_args = pytest_args or ["--test-type", "api"]
+
+    def run(self) -> str:
+        """Run pytest in collect-only mode and return the raw importtime output"""
+        # --capture=no: pytest captures fd 2 before loading conftests and test modules,
+        # which would swallow exactly the importtime lines this report is about
+        cmd = [
+            sys.executable, "-X", "importtime", "-m", "pytest",
+            "--collect-only", "-q", "-p", "no:cacheprovider", "--capture=no",
+            *self.pytest_args,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        return result.stderr
+
+    @staticmethod
+    def parse(raw_output: str) -> Dict[str, Tuple[int, int]]:
+        """Parse importtime output into {module: (self_us, cumulative_us)}"""
+        modules: Dict[str, Tuple[int, int]] = {}
+        for line in raw_output.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, module = match.groups()
+            # Keep the largest cumulative figure when a module appears more than once
+            previous = modules.get(module, (0, 0))
+            if int(cumulative_us) >= previous[1]:
+                modules[module] = (int(self_us), int(cumulative_us))
+        return modules
+
+    def report(self, top: int = 20) -> Dict[str, Tuple[int, int]]:
+        """Print the slowest imports and the status of watched heavy packages"""
+        modules = self.parse(self.run())
+        total_us = sum(self_us for self_us, _ in modules.values())
+
+        print(f"\n{'=' * 60}")
+        print(f"⏱️  IMPORT TIME REPORT (pytest {' '.join(self.pytest_args)})")
+        print(f"{'=' * 60}")
+        print(f"Total import time: {total_us / 1000:.1f}ms across {len(modules)} modules")
+        print(f"\nTop {top} imports by cumulative time:")
+        ranked = sorted(modules.items(), key=lambda entry: entry[1][1], reverse=True)
+        for module, (self_us, cumulative_us) in ranked[:top]:
+            print(f"   {cumulative_us / 1000:8.1f}ms  (self {self_us / 1000:6.1f}ms)  {module}")
+
+        print(f"\nWatched packages:")
+        for package in WATCHED_PACKAGES:
+            loaded = [m for m in modules if m == package or m.startswith(f"{package}.")]
+            status = f"LOADED ({len(loaded)} modules)" if loaded else "not loaded"
+            print(f"   {package:<20} {status}")
+        print(f"{'=' * 60}")
+
+        return modules
+
+
+if __name__ == "__main__":
+    # Usage: python -m utils.startup_profiler [pytest args...]
+    StartupProfiler(sys.argv[1:] or None).report()
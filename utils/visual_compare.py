@@ -0,0 +1,349 @@
+# utils/visual_compare.py
+import io
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw
+
+from utils.config import config
+
+# (x, y, width, height) in screenshot pixels
+Region = Tuple[int, int, int, int]
+
+BASELINE_ROOT = Path("visual_baselines")
+DIFF_HIGHLIGHT = (255, 0, 0)
+# The perceptual hash is computed on a box-reduced copy, never on the full frame
+HASH_REDUCE_FACTOR = 8
+# Above this share of the frame, the anti-aliasing check reads the full frame instead of a crop
+CROP_MAX_FRACTION = 0.25
+# Changed rows closer than this are diffed as one band
+BAND_GAP = 16
+# Mismatch search: tile size of the reduced mask, and the tile count above which a plain scan is cheaper
+MASK_TILE = 16
+TILE_SCAN_MAX = 64
+# Up to this many scattered mismatches, only their 3x3 neighbourhoods are read
+SPARSE_MAX_PIXELS = 256
+# Horizontal neighbours first - sub-pixel text rendering mostly shifts along x
+NEIGHBOUR_OFFSETS = [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def _decode(png: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(png))
+    image.load()
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def _row_words(image: Image.Image) -> np.ndarray:
+    """One row of machine words per image row - comparing these finds changed rows in one pass"""
+    raw = np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(image.height, -1)
+    return raw.view(np.uint32) if raw.shape[1] % 4 == 0 else raw
+
+
+class _Baseline(NamedTuple):
+    """A decoded baseline plus everything derived from it that does not depend on the screenshot"""
+    png: bytes
+    image: Image.Image
+    rows: np.ndarray
+    small: Image.Image
+
+    @classmethod
+    def from_png(cls, png: bytes) -> "_Baseline":
+        image = _decode(png)
+        return cls(png, image, _row_words(image), image.reduce(HASH_REDUCE_FACTOR))
+
+
+@lru_cache(maxsize=32)
+def _load_baseline(path: str, mtime_ns: int) -> _Baseline:
+    """Decoded baseline, cached until the file changes (mtime is part of the key)"""
+    return _Baseline.from_png(Path(path).read_bytes())
+
+
+@dataclass
+class VisualDiffResult:
+    """Outcome of a single baseline comparison"""
+    name: str
+    matched: bool
+    reason: str
+    diff_pixels: int = 0
+    diff_ratio: float = 0.0
+    hash_distance: int = 0
+    elapsed_ms: float = 0.0
+    diff_image: Optional[bytes] = field(default=None, repr=False)
+
+
+class VisualComparator:
+    """
+    Screenshot comparison against stored baselines
+
+    Pipeline (cheapest first):
+        1. byte-identical PNGs pass immediately
+        2. size mismatch, or a large dHash distance computed on an 8x-reduced copy,
+           fails before any full-size array is built
+        3. rows are compared word-wise against the cached baseline; only bands of
+           changed rows get a per-pixel diff in Pillow's C ops
+        4. the anti-aliasing check runs with NumPy only at the mismatched coordinates
+    """
+
+    def __init__(self,
+                 pixel_threshold: int = 24,
+                 max_diff_ratio: float = 0.001,
+                 hash_threshold: int = 12,
+                 baseline_root: Path = BASELINE_ROOT):
+        """
+        Args:
+            pixel_threshold: Max per-channel difference (0-255) still treated as equal
+            max_diff_ratio: Fraction of differing pixels tolerated before failing
+            hash_threshold: dHash Hamming distance (of 64 bits) that fails without a pixel diff
+            baseline_root: Root folder; baselines live in <root>/<env>/<browser>/<name>.png
+        """
+        self.pixel_threshold = pixel_threshold
+        self.max_diff_ratio = max_diff_ratio
+        self.hash_threshold = hash_threshold
+        self.baseline_root = Path(baseline_root)
+        # Per-band LUT turning each channel difference into 0/255
+        self._threshold_lut = [255 if value > pixel_threshold else 0 for value in range(256)] * 3
+
+    def baseline_path(self, name: str) -> Path:
+        """Baseline location for the current environment and browser"""
+        return self.baseline_root / config.current_env / config.current_browser / f"{name}.png"
+
+    def save_baseline(self, name: str, screenshot: bytes) -> Path:
+        path = self.baseline_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(screenshot)
+        return path
+
+    def compare_to_baseline(self, name: str, actual_png: bytes,
+                            ignore_regions: Sequence[Region] = ()) -> VisualDiffResult:
+        """Compare a screenshot with its stored baseline (decoded once per process)"""
+        path = self.baseline_path(name)
+        cached = _load_baseline(str(path), path.stat().st_mtime_ns)
+        return self.compare(name, actual_png, cached.png, ignore_regions, cached=cached)
+
+    def compare(self, name: str, actual_png: bytes, baseline_png: bytes,
+                ignore_regions: Sequence[Region] = (),
+                cached: Optional[_Baseline] = None) -> VisualDiffResult:
+        """Compare two PNG screenshots and build a diff image when they differ"""
+        start = time.perf_counter()
+
+        if actual_png == baseline_png:
+            return VisualDiffResult(name, True, "identical", elapsed_ms=self._elapsed(start))
+
+        actual = _decode(actual_png)
+        if cached is None:
+            cached = _Baseline.from_png(baseline_png)
+        baseline = cached.image
+
+        if actual.size != baseline.size:
+            return VisualDiffResult(
+                name, False,
+                f"size mismatch: actual {actual.width}x{actual.height}, "
+                f"baseline {baseline.width}x{baseline.height}",
+                elapsed_ms=self._elapsed(start),
+            )
+
+        actual_small = self._blank(actual.reduce(HASH_REDUCE_FACTOR), ignore_regions)
+        baseline_small = self._blank(cached.small, ignore_regions)
+        hash_distance = self._hamming(self._dhash(actual_small), self._dhash(baseline_small))
+
+        if hash_distance > self.hash_threshold:
+            # Grossly different page - no full-size diff, the reduced diff is enough to see why
+            return VisualDiffResult(
+                name, False, f"perceptual hash distance {hash_distance} > {self.hash_threshold}",
+                hash_distance=hash_distance,
+                elapsed_ms=self._elapsed(start),
+                diff_image=self._encode(ImageChops.difference(actual_small, baseline_small)),
+            )
+
+        bands = self._changed_bands(_row_words(actual), cached.rows)
+        rows, cols = self._mismatched_pixels(actual, baseline, bands, ignore_regions)
+        if rows.size:
+            keep = ~self._anti_aliased(actual, baseline, rows, cols)
+            rows, cols = rows[keep], cols[keep]
+
+        diff_pixels = int(rows.size)
+        diff_ratio = diff_pixels / (actual.width * actual.height)
+        matched = diff_ratio <= self.max_diff_ratio
+
+        return VisualDiffResult(
+            name, matched,
+            f"{diff_pixels} pixels differ ({diff_ratio:.4%}, allowed {self.max_diff_ratio:.4%})",
+            diff_pixels=diff_pixels,
+            diff_ratio=diff_ratio,
+            hash_distance=hash_distance,
+            elapsed_ms=self._elapsed(start),
+            diff_image=None if matched else self._render_diff(actual, rows, cols),
+        )
+
+    @staticmethod
+    def _elapsed(start: float) -> float:
+        return (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _encode(image: Image.Image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _blank(small: Image.Image, ignore_regions: Sequence[Region]) -> Image.Image:
+        """Reduced image with ignored regions blanked (a copy, so cached baselines stay untouched)"""
+        if ignore_regions:
+            small = small.copy()
+            draw = ImageDraw.Draw(small)
+            for x, y, width, height in ignore_regions:
+                draw.rectangle([x // HASH_REDUCE_FACTOR, y // HASH_REDUCE_FACTOR,
+                                (x + width) // HASH_REDUCE_FACTOR, (y + height) // HASH_REDUCE_FACTOR], fill=0)
+        return small
+
+    @staticmethod
+    def _dhash(small: Image.Image) -> int:
+        """64-bit difference hash of an already reduced image"""
+        pixels = np.asarray(small.convert("L").resize((9, 8), Image.Resampling.BILINEAR), dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+        return int(np.packbits(bits).view(">u8")[0])
+
+    @staticmethod
+    def _hamming(left: int, right: int) -> int:
+        return bin(left ^ right).count("1")
+
+    @staticmethod
+    def _changed_bands(actual_rows: np.ndarray, baseline_rows: np.ndarray) -> List[Tuple[int, int]]:
+        """(top, bottom) row ranges containing byte-level changes; nearby ranges are merged"""
+        changed = np.flatnonzero((actual_rows != baseline_rows).any(axis=1))
+        if not changed.size:
+            return []
+        breaks = np.flatnonzero(np.diff(changed) > BAND_GAP)
+        tops = np.concatenate(([changed[0]], changed[breaks + 1]))
+        bottoms = np.concatenate((changed[breaks], [changed[-1]])) + 1
+        return [(int(top), int(bottom)) for top, bottom in zip(tops, bottoms)]
+
+    def _mismatched_pixels(self, actual: Image.Image, baseline: Image.Image, bands: List[Tuple[int, int]],
+                           ignore_regions: Sequence[Region]) -> Tuple[np.ndarray, np.ndarray]:
+        """Coordinates of pixels where any channel differs by more than the threshold (changed bands only)"""
+        found_rows, found_cols = [], []
+        for top, bottom in bands:
+            box = (0, top, actual.width, bottom)
+            # L is non-zero wherever any thresholded band is
+            mask = ImageChops.difference(actual.crop(box), baseline.crop(box)).point(self._threshold_lut).convert("L")
+            if ignore_regions:
+                draw = ImageDraw.Draw(mask)
+                for x, y, width, height in ignore_regions:
+                    draw.rectangle([x, y - top, x + width - 1, y - top + height - 1], fill=0)
+            rows, cols = self._mask_pixels(mask)
+            found_rows.append(rows + top)
+            found_cols.append(cols)
+        if not found_rows:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return np.concatenate(found_rows), np.concatenate(found_cols)
+
+    @staticmethod
+    def _mask_pixels(mask: Image.Image) -> Tuple[np.ndarray, np.ndarray]:
+        """Non-zero coordinates of a mask: locate mismatching tiles on a reduced copy, then scan only those"""
+        tiles = np.argwhere(np.asarray(mask.reduce(MASK_TILE)) > 0)
+        empty = np.empty(0, dtype=np.intp)
+        if not len(tiles):
+            return empty, empty
+        if len(tiles) > TILE_SCAN_MAX:
+            bbox = mask.getbbox()
+            if bbox is None:
+                return empty, empty
+            rows, cols = np.nonzero(np.asarray(mask.crop(bbox)))
+            return rows + bbox[1], cols + bbox[0]
+
+        found_rows, found_cols = [], []
+        for tile_row, tile_col in tiles:
+            top, left = int(tile_row) * MASK_TILE, int(tile_col) * MASK_TILE
+            rows, cols = np.nonzero(np.asarray(mask.crop((left, top, left + MASK_TILE, top + MASK_TILE))))
+            found_rows.append(rows + top)
+            found_cols.append(cols + left)
+        return np.concatenate(found_rows), np.concatenate(found_cols)
+
+    def _anti_aliased(self, actual: Image.Image, baseline: Image.Image,
+                      rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Which mismatched pixels are explained by a 1px shift (typical anti-aliasing /
+        sub-pixel rendering noise): the pixel matches one of its 8 neighbours in the
+        other image in both directions. Only the mismatched pixels and their
+        neighbours are read.
+        """
+        actual_flat, baseline_flat, index, neighbours = self._neighbourhoods(actual, baseline, rows, cols)
+
+        explained = np.zeros(rows.size, dtype=bool)
+        actual_in_baseline = np.zeros(rows.size, dtype=bool)
+        baseline_in_actual = np.zeros(rows.size, dtype=bool)
+        pending = np.arange(rows.size)
+        for neighbour in neighbours:
+            # Pixels already explained in both directions drop out of later offsets
+            pixel, other = index[pending], neighbour[pending]
+            actual_in_baseline[pending] |= self._within_threshold(actual_flat[pixel], baseline_flat[other])
+            baseline_in_actual[pending] |= self._within_threshold(baseline_flat[pixel], actual_flat[other])
+            done = actual_in_baseline[pending] & baseline_in_actual[pending]
+            explained[pending[done]] = True
+            pending = pending[~done]
+            if not pending.size:
+                break
+
+        return explained
+
+    @staticmethod
+    def _neighbourhoods(actual: Image.Image, baseline: Image.Image, rows: np.ndarray, cols: np.ndarray):
+        """
+        Flat (M, 3) pixel arrays for both images, the flat index of every mismatched pixel
+        and one index array per neighbour offset. Reads as little of the frame as possible:
+        a crop of the mismatch bounding box, the 3x3 neighbourhoods only (few scattered
+        pixels), or the full frame (many scattered pixels).
+        """
+        top, left = max(int(rows.min()) - 1, 0), max(int(cols.min()) - 1, 0)
+        bottom, right = min(int(rows.max()) + 2, actual.height), min(int(cols.max()) + 2, actual.width)
+        box_is_small = (bottom - top) * (right - left) <= CROP_MAX_FRACTION * actual.width * actual.height
+
+        actual_pixels, baseline_pixels = actual.load(), baseline.load()
+        if not box_is_small and rows.size <= SPARSE_MAX_PIXELS \
+                and actual_pixels is not None and baseline_pixels is not None:
+            coordinates = [(int(row), int(col)) for row, col in zip(rows, cols)]
+            needed = sorted({(min(max(r + dy, 0), actual.height - 1), min(max(c + dx, 0), actual.width - 1))
+                             for r, c in coordinates for dy, dx in [(0, 0)] + NEIGHBOUR_OFFSETS})
+            position = {coordinate: i for i, coordinate in enumerate(needed)}
+            actual_flat = np.array([actual_pixels[c, r] for r, c in needed], dtype=np.uint8)
+            baseline_flat = np.array([baseline_pixels[c, r] for r, c in needed], dtype=np.uint8)
+            index = np.array([position[coordinate] for coordinate in coordinates])
+            neighbours = [np.array([position[(min(max(r + dy, 0), actual.height - 1),
+                                              min(max(c + dx, 0), actual.width - 1))] for r, c in coordinates])
+                          for dy, dx in NEIGHBOUR_OFFSETS]
+            return actual_flat, baseline_flat, index, neighbours
+
+        if box_is_small:
+            box = (left, top, right, bottom)
+            actual_flat = np.asarray(actual.crop(box)).reshape(-1, 3)
+            baseline_flat = np.asarray(baseline.crop(box)).reshape(-1, 3)
+        else:
+            top, left, bottom, right = 0, 0, actual.height, actual.width
+            actual_flat = np.asarray(actual).reshape(-1, 3)
+            baseline_flat = np.asarray(baseline).reshape(-1, 3)
+
+        height, width = bottom - top, right - left
+        local_rows, local_cols = rows - top, cols - left
+        index = local_rows * width + local_cols
+        neighbours = [np.clip(local_rows + dy, 0, height - 1) * width + np.clip(local_cols + dx, 0, width - 1)
+                      for dy, dx in NEIGHBOUR_OFFSETS]
+        return actual_flat, baseline_flat, index, neighbours
+
+    def _within_threshold(self, pixels: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Per row: every channel differs by at most pixel_threshold (explicit per-channel ops beat max(axis=1))"""
+        delta = np.abs(pixels.astype(np.int16) - others.astype(np.int16))
+        return ((delta[:, 0] <= self.pixel_threshold) & (delta[:, 1] <= self.pixel_threshold)
+                & (delta[:, 2] <= self.pixel_threshold))
+
+    def _render_diff(self, actual: Image.Image, rows: np.ndarray, cols: np.ndarray) -> bytes:
+        """Faded grayscale of the actual screenshot with differing pixels in red"""
+        diff = actual.convert("L").point(lambda value: int(value * 0.3 + 178)).convert("RGB")
+        highlight = np.zeros((actual.height, actual.width), dtype=np.uint8)
+        highlight[rows, cols] = 255
+        diff.paste(DIFF_HIGHLIGHT, mask=Image.fromarray(highlight))
+        return self._encode(diff)
@@ -0,0 +1,303 @@
+# utils/wait_audit.py
+import functools
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.config import config
+
+AUDIT_DIR = Path("reports") / "wait_audit"
+
+# A call site's timeout (explicit, or the page default) is "over-long" when the 95th
+# percentile of its observed waits used less than this fraction of it, over at least this many calls
+TIMEOUT_HEADROOM_RATIO = 0.2
+TIMEOUT_HEADROOM_MIN_CALLS = 5
+
+PAGE_WAITS = ["wait_for_load_state", "wait_for_url", "wait_for_selector", "wait_for_timeout", "wait_for_function"]
+PAGE_NAVIGATIONS = ["goto", "reload", "go_back", "go_forward"]
+PAGE_ACTIONS = ["click", "dblclick", "fill", "type", "press", "check", "uncheck", "hover", "select_option"]
+LOCATOR_WAITS = ["wait_for"]
+LOCATOR_ACTIONS = ["click", "dblclick", "fill", "type", "press", "check", "uncheck", "hover", "select_option",
+                   "set_input_files", "text_content", "inner_text"]
+
+LOAD_STATES_SATISFIED = {
+    "load": {"complete"},
+    "domcontentloaded": {"interactive", "complete"},
+}
+# Load states a following locator call does not re-check (its auto-wait is per element)
+LOAD_STATES_NOT_COVERED = {"networkidle"}
+
+
+class WaitAuditor:
+    """
+    Records how long Playwright waits, navigations and actions block and flags wasted waiting
+
+    Flags per call:
+        already_satisfied - the wait's condition was true before the wait started
+        stacked           - a wait immediately followed by another wait, or a load/domcontentloaded
+                            wait followed by a locator call (the later call auto-waits anyway)
+        hard_sleep        - wait_for_timeout
+    Only already_satisfied and hard_sleep calls count as wasted time: a wait returns as soon as
+    its condition holds, so its duration is the time to the condition, and for a satisfied
+    wait all of it was unnecessary. How much of a stacked wait the later call would have
+    covered is not measurable from outside Playwright, so stacked is reported but not counted.
+    Per test, slow_mo overhead is estimated as slow_mo x number of actions/navigations.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_mo_ms = 0
+        self.current_test: Optional[str] = None
+        self.records: List[Dict[str, Any]] = []
+        self.tests: Dict[str, Dict[str, Any]] = {}
+        self._originals: List[tuple] = []
+        self._depth = 0
+
+    # ------------------------------------------------------------------ patching
+    def install(self):
+        """Wrap Page and Locator methods; a no-op when already installed"""
+        if self._originals:
+            return
+        from playwright.sync_api import Locator, Page
+
+        for cls, names, kind in [(Page, PAGE_WAITS, "wait"), (Page, PAGE_NAVIGATIONS, "navigation"),
+                                 (Page, PAGE_ACTIONS, "action"), (Locator, LOCATOR_WAITS, "wait"),
+                                 (Locator, LOCATOR_ACTIONS, "action")]:
+            for name in names:
+                original = getattr(cls, name, None)
+                if original is None:
+                    continue
+                self._originals.append((cls, name, original))
+                setattr(cls, name, self._wrap(original, name, kind))
+        self.enabled = True
+
+    def uninstall(self):
+        for cls, name, original in self._originals:
+            setattr(cls, name, original)
+        self._originals.clear()
+        self.enabled = False
+
+    def _wrap(self, original: Callable, name: str, kind: str) -> Callable:
+        auditor = self
+
+        @functools.wraps(original)
+        def wrapper(target, *args, **kwargs):
+            if auditor.current_test is None or auditor._depth:
+                return original(target, *args, **kwargs)
+
+            auditor._depth += 1
+            try:
+                satisfied = auditor._probe(target, name, args, kwargs) if kind == "wait" else None
+                start = time.perf_counter()
+                try:
+                    return original(target, *args, **kwargs)
+                finally:
+                    auditor._record(target, name, kind, args, kwargs,
+                                    (time.perf_counter() - start) * 1000, satisfied)
+            finally:
+                auditor._depth -= 1
+
+        return wrapper
+
+    # ------------------------------------------------------------------ probes
+    @staticmethod
+    def _probe(target, name: str, args: tuple, kwargs: dict) -> Optional[bool]:
+        """Cheaply check whether a wait's condition already holds (None when unknown)"""
+        try:
+            if name == "wait_for_load_state":
+                state = args[0] if args else kwargs.get("state", "load")
+                satisfied_by = LOAD_STATES_SATISFIED.get(state)
+                if satisfied_by is None:
+                    return None
+                return target.evaluate("document.readyState") in satisfied_by
+            if name == "wait_for":
+                state = args[0] if args else kwargs.get("state", "visible")
+                if state == "visible":
+                    return target.is_visible()
+                if state == "hidden":
+                    return target.is_hidden()
+                if state == "attached":
+                    return target.count() > 0
+                if state == "detached":
+                    return target.count() == 0
+            if name == "wait_for_url":
+                url = args[0] if args else kwargs.get("url")
+                return isinstance(url, str) and target.url == url
+        except Exception:
+            return None
+        return None
+
+    # ------------------------------------------------------------------ recording
+    @staticmethod
+    def _call_site() -> str:
+        """First frame outside Playwright and this module, e.g. pages/cart_page.py:21"""
+        frame: Optional[FrameType] = sys._getframe(1)
+        root = os.getcwd()
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename != __file__ and "playwright" not in filename.split(os.sep)[-3:-1]:
+                return f"{os.path.relpath(filename, root)}:{frame.f_lineno}"
+            frame = frame.f_back
+        return "unknown"
+
+    def _record(self, target, name: str, kind: str, args: tuple, kwargs: dict,
+                duration_ms: float, satisfied: Optional[bool]):
+        flags = []
+        if satisfied:
+            flags.append("already_satisfied")
+        if name == "wait_for_timeout":
+            flags.append("hard_sleep")
+        if self.records and self.records[-1]["kind"] == "wait":
+            previous = self.records[-1]
+            covered_by_locator = (previous["call"].endswith(".wait_for_load_state")
+                                  and previous["state"] not in LOAD_STATES_NOT_COVERED
+                                  and type(target).__name__ == "Locator")
+            if kind == "wait" or covered_by_locator:
+                previous["flags"].append("stacked")
+
+        timeout = kwargs.get("timeout")
+        if name == "wait_for_timeout":
+            timeout = args[0] if args else kwargs.get("timeout")
+        state = None
+        if name == "wait_for_load_state":
+            state = args[0] if args else kwargs.get("state", "load")
+        self.records.append({
+            "site": self._call_site(),
+            "call": f"{type(target).__name__}.{name}",
+            "kind": kind,
+            "state": state,
+            "duration_ms": round(duration_ms, 2),
+            "timeout_ms": timeout if timeout is not None else config.timeout,
+            # wait_for_timeout's argument is the sleep itself, not a limit
+            "timeout_source": None if name == "wait_for_timeout" else "explicit" if timeout is not None else "default",
+            "flags": flags,
+        })
+
+    def start_test(self, nodeid: str):
+        self.current_test = nodeid
+        self.records = []
+
+    def finish_test(self):
+        """Summarise the current test's records and reset"""
+        if self.current_test is None:
+            return
+        blocking = [r for r in self.records if r["kind"] in ("action", "navigation")]
+        self.tests[self.current_test] = {
+            "records": self.records,
+            "wait_ms": round(sum(r["duration_ms"] for r in self.records if r["kind"] == "wait"), 2),
+            "wasted_ms": round(sum(r["duration_ms"] for r in self.records if self._is_wasted(r)), 2),
+            "slow_mo_overhead_ms": self.slow_mo_ms * len(blocking),
+        }
+        self.current_test = None
+        self.records = []
+
+    @staticmethod
+    def _is_wasted(record: Dict[str, Any]) -> bool:
+        return bool({"already_satisfied", "hard_sleep"} & set(record["flags"]))
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> float:
+        """Nearest-rank percentile"""
+        ordered = sorted(values)
+        return ordered[max(int(round(fraction * len(ordered))) - 1, 0)]
+
+    # ------------------------------------------------------------------ reporting
+    def dump(self, worker_id: str) -> Optional[Path]:
+        """Write this process' results so the controller can merge them"""
+        if not self.tests:
+            return None
+        AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+        path = AUDIT_DIR / f"wait_audit_{worker_id}.json"
+        path.write_text(json.dumps(self.tests, indent=2))
+        return path
+
+    @staticmethod
+    def clear_results():
+        if AUDIT_DIR.exists():
+            for path in AUDIT_DIR.glob("wait_audit_*.json"):
+                path.unlink()
+
+    @staticmethod
+    def load_results() -> Dict[str, Dict[str, Any]]:
+        tests: Dict[str, Dict[str, Any]] = {}
+        for path in AUDIT_DIR.glob("wait_audit_*.json"):
+            tests.update(json.loads(path.read_text()))
+        return tests
+
+    @staticmethod
+    def summarize(tests: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Rank call sites by blocked and wasted time across all tests"""
+        sites: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"kind": "", "calls": 0, "blocked_ms": 0.0, "wasted_ms": 0.0, "max_ms": 0.0,
+                     "timeout_ms": 0, "timeout_source": None, "durations": [], "flags": defaultdict(int)})
+        for test in tests.values():
+            for record in test["records"]:
+                site = sites[f"{record['site']} {record['call']}"]
+                site["kind"] = record["kind"]
+                site["calls"] += 1
+                site["blocked_ms"] += record["duration_ms"]
+                site["max_ms"] = max(site["max_ms"], record["duration_ms"])
+                site["timeout_ms"] = max(site["timeout_ms"], record["timeout_ms"] or 0)
+                if record["timeout_source"] and site["timeout_source"] != "explicit":
+                    site["timeout_source"] = record["timeout_source"]
+                site["durations"].append(record["duration_ms"])
+                if WaitAuditor._is_wasted(record):
+                    site["wasted_ms"] += record["duration_ms"]
+                for flag in record["flags"]:
+                    site["flags"][flag] += 1
+
+        for site in sites.values():
+            durations = site.pop("durations")
+            site["p95_ms"] = WaitAuditor._percentile(durations, 0.95)
+            if (site["kind"] == "wait" and site["timeout_source"]
+                    and site["calls"] >= TIMEOUT_HEADROOM_MIN_CALLS
+                    and site["p95_ms"] < site["timeout_ms"] * TIMEOUT_HEADROOM_RATIO):
+                site["flags"]["timeout_headroom"] = site["calls"]
+            site["flags"] = dict(site["flags"])
+
+        return {
+            "tests": len(tests),
+            "blocked_ms": round(sum(s["blocked_ms"] for s in sites.values()), 2),
+            "wasted_ms": round(sum(t["wasted_ms"] for t in tests.values()), 2),
+            "slow_mo_overhead_ms": sum(t["slow_mo_overhead_ms"] for t in tests.values()),
+            "sites": sorted(sites.items(), key=lambda item: item[1]["blocked_ms"], reverse=True),
+        }
+
+    @staticmethod
+    def _flag_label(flag: str, site: Dict[str, Any]) -> str:
+        """timeout_headroom says which timeout is over-long: the page default or one passed at the call"""
+        if flag != "timeout_headroom":
+            return flag
+        source = "explicit" if site["timeout_source"] == "explicit" else "default timeout"
+        return f"timeout_headroom ({source} {site['timeout_ms']}ms, p95 {site['p95_ms']}ms)"
+
+    def print_report(self, top: int = 15):
+        """Merge all worker results and print where waiting time is spent"""
+        tests = self.load_results()
+        if not tests:
+            return
+        summary = self.summarize(tests)
+        (AUDIT_DIR / "summary.json").write_text(json.dumps(summary, indent=2))
+
+        print(f"\n{'=' * 60}")
+        print(f"⏳ WAIT AUDIT ({summary['tests']} tests)")
+        print(f"{'=' * 60}")
+        print(f"Total blocked: {summary['blocked_ms'] / 1000:.2f}s")
+        print(f"Wasted (already satisfied/sleep): {summary['wasted_ms'] / 1000:.2f}s")
+        print(f"Estimated slow_mo overhead: {summary['slow_mo_overhead_ms'] / 1000:.2f}s")
+        print(f"\nTop {top} call sites by blocked time:")
+        for key, site in summary["sites"][:top]:
+            flags = ", ".join(f"{self._flag_label(flag, site)} x{count}" for flag, count in site["flags"].items())
+            print(f"   {site['blocked_ms']:9.1f}ms  wasted {site['wasted_ms']:8.1f}ms  "
+                  f"calls {site['calls']:3d}  {key}" + (f"  [{flags}]" if flags else ""))
+        print(f"\n📁 Full report: {AUDIT_DIR / 'summary.json'}")
+        print(f"{'=' * 60}")
+
+
+# Global auditor instance
+wait_auditor = WaitAuditor()